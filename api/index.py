@@ -2,14 +2,48 @@ import os
 import tempfile
 import requests
 from http.cookiejar import MozillaCookieJar
-from flask import Flask, request, jsonify
+from flask import Flask, g, has_request_context, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_caching import Cache
+from flask_caching.backends.base import BaseCache
 from youtube_search import YoutubeSearch
 import yt_dlp
+import yt_dlp.cache
+import yt_dlp.extractor
+import atexit
+import bisect
+import collections
 import concurrent.futures
+import contextlib
+import fcntl
 import functools
+import gzip
+import hashlib
+import hmac
+import itertools
+import json
+import math
+import mmap
+import multiprocessing
+import pickle
+import queue
+import re
+import resource
+import sqlite3
+import struct
+import sys
 import threading
 import time
+import urllib.parse
+import zlib
+try:
+    import brotli
+except ImportError:  # optional: br responses are only offered when installed
+    brotli = None
+try:
+    import orjson
+except ImportError:  # optional: FastJSONProvider falls back to the stdlib encoder
+    orjson = None
 
 # -------------------------
 # Use Temp Directory for All File Operations (Vercel/Koyeb/Netlify compatibility)
@@ -39,27 +73,1033 @@ if os.path.exists(cookie_file):
 
     requests.get = get_with_cookies
 
+# -------------------------
+# JSON provider: orjson straight to bytes when installed, stdlib otherwise
+# Output matches Flask's provider (sorted keys, http-date for dates, same
+# default hook), except non-ASCII is emitted as UTF-8 rather than escaped.
+# JSON_ENCODER=stdlib forces the fallback.
+# -------------------------
+JSON_ENCODER = os.environ.get('JSON_ENCODER', 'orjson' if orjson is not None else 'stdlib').lower()
+
+class FastJSONProvider(DefaultJSONProvider):
+    use_orjson = JSON_ENCODER == 'orjson' and orjson is not None
+
+    def _orjson_options(self, indent):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps_bytes(self, obj, indent=None):
+        """UTF-8 JSON for obj, compact unless indent is set."""
+        if self.use_orjson:
+            try:
+                return orjson.dumps(obj, default=self.default, option=self._orjson_options(indent))
+            except TypeError:
+                pass  # e.g. ints beyond 64 bits; the stdlib encoder copes
+        kwargs = {'indent': indent} if indent else {'separators': (',', ':')}
+        return super().dumps(obj, **kwargs).encode()
+
+    def dumps(self, obj, **kwargs):
+        if self.use_orjson and set(kwargs) <= {'indent'}:
+            return self.dumps_bytes(obj, kwargs.get('indent')).decode()
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = 2 if (self.compact is None and self._app.debug) or self.compact is False else None
+        return self._app.response_class(self.dumps_bytes(obj, indent) + b'\n', mimetype=self.mimetype)
+
 # -------------------------
 # Flask App Initialization
 # -------------------------
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
+
+# -------------------------
+# Disk-backed second cache tier (survives cold starts on the same instance)
+# SQLite in WAL mode under temp_dir, opened on first use. Entries are pickled,
+# zlib-compressed and stored with their absolute expiry; a single writer
+# thread does the compression and commits so requests never wait on disk,
+# and reads see writes still queued for it. Past DISK_CACHE_MAX_MB the least
+# recently read entries are evicted. DISK_CACHE_MAX_MB=0 disables the tier.
+# The default is a quarter of temp_dir's filesystem, at most 128 MB: on
+# serverless hosts /tmp is small and also holds the yt-dlp cache dir (and
+# the shared response segment when there is no /dev/shm).
+# -------------------------
+def _disk_cache_default_mb():
+    try:
+        st = os.statvfs(temp_dir)
+    except OSError:
+        return 64
+    return min(128, st.f_frsize * st.f_blocks // 4 // (1024 * 1024))
+
+DISK_CACHE_PATH = os.environ.get('DISK_CACHE_PATH', os.path.join(temp_dir, 'ytk-cache.sqlite3'))
+DISK_CACHE_MAX_BYTES = int(os.environ.get('DISK_CACHE_MAX_MB', str(_disk_cache_default_mb()))) * 1024 * 1024
+DISK_CACHE_QUEUE = int(os.environ.get('DISK_CACHE_QUEUE', '256'))
+DISK_CACHE_EVICT_EVERY = 64
+
+class DiskCache:
+    _DELETE = object()
+
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._reader = None
+        self._writer = None
+        self._queue = queue.Queue(DISK_CACHE_QUEUE)
+        self._pending = {}  # key -> (value, expires_at) or _DELETE, until the writer has applied it
+        self._pending_lock = threading.Lock()
+        self._writes = 0
+        self.stats = collections.Counter()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB NOT NULL, '
+                     'expires_at REAL NOT NULL, size INTEGER NOT NULL, accessed_at REAL NOT NULL)')
+        conn.execute('CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)')
+        return conn
+
+    def get(self, key):
+        """(value, expires_at) for a live entry, else None; expires_at 0 means no expiry."""
+        with self._pending_lock:
+            pending = self._pending.get(key)
+        if pending is not None:
+            return None if pending is self._DELETE else pending
+        try:
+            with self._lock:
+                if self._reader is None:
+                    self._reader = self._connect()
+                row = self._reader.execute('SELECT value, expires_at FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None or (row[1] and row[1] <= time.time()):
+                self.stats['misses'] += 1
+                return None
+            value = pickle.loads(zlib.decompress(row[0]))
+        except Exception:
+            self.stats['errors'] += 1
+            return None
+        self.stats['hits'] += 1
+        self._enqueue('touch', key, None)
+        return value, row[1]
+
+    def set(self, key, value, expires_at):
+        entry = (value, expires_at)
+        with self._pending_lock:
+            self._pending[key] = entry
+        self._enqueue('set', key, entry)
+
+    def delete(self, key):
+        with self._pending_lock:
+            self._pending[key] = self._DELETE
+        self._enqueue('delete', key, self._DELETE)
+
+    def clear(self):
+        with self._pending_lock:
+            self._pending.clear()
+        self._enqueue('clear', None, None)
+
+    def _enqueue(self, op, key, payload):
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name='disk-cache-writer', daemon=True)
+                self._writer.start()
+        try:
+            if op in ('set', 'touch'):
+                self._queue.put_nowait((op, key, payload))
+            else:
+                # deletes must land, or a later read would resurrect the entry
+                self._queue.put((op, key, payload))
+        except queue.Full:
+            self.stats['dropped'] += 1
+            if op == 'set':
+                self._settle(key, payload)
+
+    def _settle(self, key, payload):
+        with self._pending_lock:
+            if self._pending.get(key) is payload:
+                del self._pending[key]
+
+    def _write_loop(self):
+        conn = None
+        while True:
+            op, key, payload = self._queue.get()
+            try:
+                if conn is None:
+                    conn = self._connect()
+                if op == 'set':
+                    value, expires_at = payload
+                    blob = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 1)
+                    conn.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)',
+                                 (key, blob, expires_at, len(blob), time.time()))
+                    self.stats['writes'] += 1
+                    self._writes += 1
+                    if self._writes % DISK_CACHE_EVICT_EVERY == 1:
+                        self._evict(conn)
+                elif op == 'touch':
+                    conn.execute('UPDATE entries SET accessed_at = ? WHERE key = ?', (time.time(), key))
+                elif op == 'delete':
+                    conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+                elif op == 'clear':
+                    conn.execute('DELETE FROM entries')
+            except Exception:
+                self.stats['errors'] += 1
+            finally:
+                if op in ('set', 'delete'):
+                    self._settle(key, payload)
+
+    def _evict(self, conn):
+        conn.execute('DELETE FROM entries WHERE expires_at > 0 AND expires_at <= ?', (time.time(),))
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        self.stats['bytes'] = total
+        if total <= self.max_bytes:
+            return
+        # trim to 90% of the cap so eviction doesn't run on every write
+        excess = total - int(self.max_bytes * 0.9)
+        victims = []
+        for key, size in conn.execute('SELECT key, size FROM entries ORDER BY accessed_at'):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany('DELETE FROM entries WHERE key = ?', victims)
+        self.stats['evicted'] += len(victims)
+        self.stats['bytes'] = conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    def snapshot(self):
+        with self._pending_lock:
+            pending = len(self._pending)
+        return dict(self.stats, path=self.path, max_bytes=self.max_bytes, pending=pending)
+
+# -------------------------
+# Byte-budgeted cache backend (W-TinyLFU)
+# Entries are sized when stored and evicted by bytes, not by count. New keys
+# land in a small LRU window; when the window overflows, its oldest entry
+# only enters the main LRU if the count-min sketch has seen it more often
+# than the entries it would displace, so one-off lookups can't flush hot keys.
+# Values are kept as-is (no pickling); callers must not mutate what they get.
+# -------------------------
+CACHE_MAX_BYTES = int(os.environ.get('CACHE_MAX_MB', '256')) * 1024 * 1024
+CACHE_MAX_ENTRY_BYTES = int(os.environ.get('CACHE_MAX_ENTRY_MB', '16')) * 1024 * 1024
+CACHE_WINDOW_FRACTION = float(os.environ.get('CACHE_WINDOW_FRACTION', '0.01'))
+CACHE_SKETCH_WIDTH = int(os.environ.get('CACHE_SKETCH_WIDTH', '16384'))
+CACHE_SWEEP_INTERVAL = 60
+
+_HALVE = bytes(v >> 1 for v in range(256))
+
+def estimate_size(obj):
+    """Approximate deep size in bytes of a JSON-like object graph."""
+    seen = set()
+    stack = [obj]
+    size = 0
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        size += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+    return size
+
+class FrequencySketch:
+    """Count-min sketch with 4 rows of saturating 4-bit counters, halved
+    every 10 * width increments so old popularity fades."""
+
+    DEPTH = 4
+    MAX_COUNT = 15
+
+    def __init__(self, width):
+        width = 1 << max(width - 1, 1).bit_length()
+        self.mask = width - 1
+        self.rows = [bytearray(width) for _ in range(self.DEPTH)]
+        self.sample_size = 10 * width
+        self.additions = 0
+
+    def _indexes(self, key):
+        h = hash(key)
+        h1, h2 = h & 0xffffffff, ((h >> 32) & 0xffffffff) | 1
+        return [(h1 + i * h2) & self.mask for i in range(self.DEPTH)]
+
+    def increment(self, key):
+        added = False
+        for row, i in zip(self.rows, self._indexes(key)):
+            if row[i] < self.MAX_COUNT:
+                row[i] += 1
+                added = True
+        if added:
+            self.additions += 1
+            if self.additions >= self.sample_size:
+                for row in self.rows:
+                    row[:] = row.translate(_HALVE)
+                self.additions //= 2
+
+    def estimate(self, key):
+        return min(row[i] for row, i in zip(self.rows, self._indexes(key)))
+
+class BudgetCache(BaseCache):
+    def __init__(self, default_timeout=300, max_bytes=CACHE_MAX_BYTES, max_entry_bytes=CACHE_MAX_ENTRY_BYTES,
+                 window_fraction=CACHE_WINDOW_FRACTION, sketch_width=CACHE_SKETCH_WIDTH, disk=None):
+        super().__init__(default_timeout)
+        self.disk = disk
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = min(max_entry_bytes, max_bytes)
+        self.window_bytes = max(int(max_bytes * window_fraction), 1)
+        self.main_bytes = max_bytes - self.window_bytes
+        self._window = collections.OrderedDict()  # key -> (expires_at, size, value)
+        self._main = collections.OrderedDict()
+        self._used = {'window': 0, 'main': 0}
+        self._sketch = FrequencySketch(sketch_width)
+        self._lock = threading.RLock()
+        self._next_sweep = 0
+        self.stats = collections.Counter()
+        self._prefix_bytes = collections.Counter()
+        self._prefix_entries = collections.Counter()
+        self._prefix_hits = collections.Counter()
+        self._prefix_misses = collections.Counter()
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        disk = DiskCache(DISK_CACHE_PATH, DISK_CACHE_MAX_BYTES) if DISK_CACHE_MAX_BYTES > 0 else None
+        return cls(*args, disk=disk, **kwargs)
+
+    @staticmethod
+    def _prefix(key):
+        return key.split(':', 1)[0]
+
+    def _expiry(self, timeout):
+        timeout = self._normalize_timeout(timeout)
+        return time.time() + timeout if timeout > 0 else 0
+
+    def _segment(self, key):
+        if key in self._window:
+            return 'window', self._window
+        if key in self._main:
+            return 'main', self._main
+        return None, None
+
+    def _drop(self, key, name, segment):
+        _, size, _ = segment.pop(key)
+        self._used[name] -= size
+        prefix = self._prefix(key)
+        self._prefix_bytes[prefix] -= size
+        self._prefix_entries[prefix] -= 1
+
+    def _sweep(self, now):
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + CACHE_SWEEP_INTERVAL
+        for name, segment in (('window', self._window), ('main', self._main)):
+            for key in [k for k, (exp, _, _) in segment.items() if exp and exp <= now]:
+                self._drop(key, name, segment)
+                self.stats['expired'] += 1
+
+    def _admit(self, key, entry):
+        """Move a candidate evicted from the window into main, if it earns it."""
+        size = entry[1]
+        needed = self._used['main'] + size - self.main_bytes
+        victims = []
+        if needed > 0:
+            freq = self._sketch.estimate(key)
+            for victim in self._main:
+                if self._sketch.estimate(victim) >= freq:
+                    self.stats['rejected'] += 1
+                    return
+                victims.append(victim)
+                needed -= self._main[victim][1]
+                if needed <= 0:
+                    break
+        for victim in victims:
+            self._drop(victim, 'main', self._main)
+            self.stats['evicted'] += 1
+        self._main[key] = entry
+        self._used['main'] += size
+        prefix = self._prefix(key)
+        self._prefix_bytes[prefix] += size
+        self._prefix_entries[prefix] += 1
+
+    def get(self, key):
+        prefix = self._prefix(key)
+        with self._lock:
+            self._sketch.increment(key)
+            name, segment = self._segment(key)
+            if segment is not None:
+                expires_at, _, value = segment[key]
+                if not expires_at or expires_at > time.time():
+                    segment.move_to_end(key)
+                    self._prefix_hits[prefix] += 1
+                    return value
+                self._drop(key, name, segment)
+                self.stats['expired'] += 1
+        found = self.disk.get(key) if self.disk is not None else None
+        if found is None:
+            with self._lock:
+                self._prefix_misses[prefix] += 1
+            return None
+        value, expires_at = found
+        self._insert(key, value, expires_at)
+        with self._lock:
+            self._prefix_hits[prefix] += 1
+            self.stats['disk_hits'] += 1
+        return value
+
+    def has(self, key):
+        with self._lock:
+            _, segment = self._segment(key)
+            if segment is None:
+                return False
+            expires_at = segment[key][0]
+            return not expires_at or expires_at > time.time()
+
+    def set(self, key, value, timeout=None):
+        expires_at = self._expiry(timeout)
+        stored = self._insert(key, value, expires_at)
+        if self.disk is not None:
+            self.disk.set(key, value, expires_at)
+        return stored
+
+    def _insert(self, key, value, expires_at):
+        size = estimate_size(value) + sys.getsizeof(key)
+        with self._lock:
+            name, segment = self._segment(key)
+            if segment is not None:
+                self._drop(key, name, segment)
+            if size > self.max_entry_bytes:
+                self.stats['oversize'] += 1
+                return False
+            self._sweep(time.time())
+            self._window[key] = (expires_at, size, value)
+            self._used['window'] += size
+            prefix = self._prefix(key)
+            self._prefix_bytes[prefix] += size
+            self._prefix_entries[prefix] += 1
+            while self._used['window'] > self.window_bytes and self._window:
+                candidate = next(iter(self._window))
+                entry = self._window[candidate]
+                self._drop(candidate, 'window', self._window)
+                self._admit(candidate, entry)
+            return True
+
+    def add(self, key, value, timeout=None):
+        with self._lock:
+            if self.has(key):
+                return False
+            return self.set(key, value, timeout)
+
+    def delete(self, key):
+        if self.disk is not None:
+            self.disk.delete(key)
+        with self._lock:
+            name, segment = self._segment(key)
+            if segment is None:
+                return False
+            self._drop(key, name, segment)
+            return True
+
+    def clear(self):
+        if self.disk is not None:
+            self.disk.clear()
+        with self._lock:
+            self._window.clear()
+            self._main.clear()
+            self._used = {'window': 0, 'main': 0}
+            self._prefix_bytes.clear()
+            self._prefix_entries.clear()
+            return True
+
+    def snapshot(self):
+        with self._lock:
+            hits, misses = sum(self._prefix_hits.values()), sum(self._prefix_misses.values())
+            prefixes = {}
+            for prefix in set(self._prefix_bytes) | set(self._prefix_hits) | set(self._prefix_misses):
+                p_hits, p_misses = self._prefix_hits[prefix], self._prefix_misses[prefix]
+                prefixes[prefix] = {
+                    'bytes': self._prefix_bytes[prefix],
+                    'entries': self._prefix_entries[prefix],
+                    'hits': p_hits,
+                    'misses': p_misses,
+                    'hit_ratio': round(p_hits / (p_hits + p_misses), 4) if p_hits + p_misses else None,
+                }
+            return dict(self.stats,
+                        max_bytes=self.max_bytes,
+                        used_bytes=self._used['window'] + self._used['main'],
+                        window_bytes=self._used['window'],
+                        entries=len(self._window) + len(self._main),
+                        hits=hits,
+                        misses=misses,
+                        hit_ratio=round(hits / (hits + misses), 4) if hits + misses else None,
+                        prefixes=prefixes,
+                        disk=self.disk.snapshot() if self.disk is not None else None)
 
 # -------------------------
 # Cache Configuration (In-Memory)
 # -------------------------
 cache = Cache(app, config={
-    'CACHE_TYPE': 'simple',  # In-memory
+    'CACHE_TYPE': f'{__name__}.BudgetCache',  # In-memory, byte-budgeted
     'CACHE_DEFAULT_TIMEOUT': 0  # "Infinite" until invalidated
 })
 
+# -------------------------
+# Host-wide response segment shared by all worker processes
+# An mmap'd file (in /dev/shm when available) with a hash index of fixed
+# slots in front of a ring of serialized JSON bodies.
+# - reads are lock-free: each slot carries a sequence number that is odd
+#   while a writer is updating it (seqlock), and readers retry on a change
+# - writers take a flock, reserve ring space by advancing the cursor first,
+#   then copy the body and publish the slot
+# - a body is only overwritten after SHM_CACHE_MB of newer writes; readers
+#   copy it out and re-check the slot and cursor before trusting the copy
+# SHM_CACHE_MB=0 disables the segment; opened on first use.
+# -------------------------
+SHM_CACHE_PATH = os.environ.get('SHM_CACHE_PATH', os.path.join(
+    '/dev/shm' if os.path.isdir('/dev/shm') else temp_dir, 'ytk-responses.shm'))
+SHM_CACHE_BYTES = int(os.environ.get('SHM_CACHE_MB', '64')) * 1024 * 1024
+SHM_CACHE_SLOTS = int(os.environ.get('SHM_CACHE_SLOTS', '16384'))
+SHM_PROBES = 4
+
+class SharedSegment:
+    MAGIC = b'YTKS'
+    VERSION = 4
+    HEADER = struct.Struct('<4sIIIQQ')  # magic, version, slots, reserved, data_size, cursor
+    HEADER_SIZE = 64
+    CURSOR = struct.Struct('<Q')
+    CURSOR_OFFSET = 24
+    SEQ = struct.Struct('<I')
+    SLOT = struct.Struct('<II16sdQ')  # seq, length, key digest, expires_at, ring offset
+    FIELDS = struct.Struct('<I16sdQ')
+    EMPTY = bytes(16)
+
+    def __init__(self, path, size, slots):
+        self.path = path
+        self.slots = slots
+        self.index_size = slots * self.SLOT.size
+        self.data_offset = self.HEADER_SIZE + self.index_size
+        self.data_size = size - self.data_offset
+        self.max_entry = self.data_size // 4
+        self._mm = None
+        self._fd = None
+        self._failed = False
+        self._lock = threading.Lock()
+        self.stats = collections.Counter()
+
+    def _map(self):
+        if self._mm is not None or self._failed:
+            return self._mm
+        with self._lock:
+            if self._mm is None and not self._failed:
+                try:
+                    self._open()
+                except OSError:
+                    self._failed = True
+        return self._mm
+
+    def _open(self):
+        total = self.data_offset + self.data_size
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            header = os.pread(fd, self.HEADER.size, 0)
+            expected = (self.MAGIC, self.VERSION, self.slots, 0, self.data_size)
+            if os.fstat(fd).st_size != total or self.HEADER.unpack(header.ljust(self.HEADER.size, b'\0'))[:5] != expected:
+                # first worker on the host (or a different geometry): start from zeroed slots
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, total)
+                os.pwrite(fd, self.HEADER.pack(*expected, 0), 0)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        self._fd = fd
+        self._mm = mmap.mmap(fd, total)
+
+    @staticmethod
+    def _digest(key):
+        return hashlib.blake2b(key.encode(), digest_size=16).digest()
+
+    def _slots(self, digest):
+        h = int.from_bytes(digest[:8], 'little')
+        return [self.HEADER_SIZE + ((h + i) % self.slots) * self.SLOT.size for i in range(SHM_PROBES)]
+
+    def _read_slot(self, mm, pos):
+        for _ in range(8):
+            seq = self.SEQ.unpack_from(mm, pos)[0]
+            if seq & 1:
+                continue
+            slot = self.SLOT.unpack_from(mm, pos)
+            if self.SEQ.unpack_from(mm, pos)[0] == seq:
+                return slot
+        return None
+
+    def _intact(self, mm, offset):
+        return offset + self.data_size >= self.CURSOR.unpack_from(mm, self.CURSOR_OFFSET)[0]
+
+    def get(self, key):
+        """Copy of the stored body as bytes, or None."""
+        mm = self._map()
+        if mm is None:
+            return None
+        digest = self._digest(key)
+        for pos in self._slots(digest):
+            slot = self._read_slot(mm, pos)
+            if slot is None or slot[2] != digest:
+                continue
+            _, length, _, expires_at, offset = slot
+            if (expires_at and expires_at <= time.time()) or not self._intact(mm, offset):
+                break
+            start = self.data_offset + offset % self.data_size
+            body = mm[start:start + length]
+            # a writer may have reused the slot or wrapped over the body mid-copy
+            if self._read_slot(mm, pos) != slot or not self._intact(mm, offset):
+                break
+            self.stats['hits'] += 1
+            return body
+        self.stats['misses'] += 1
+        return None
+
+    @contextlib.contextmanager
+    def _writing(self):
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _publish(self, mm, pos, length, digest, expires_at, offset):
+        seq = self.SEQ.unpack_from(mm, pos)[0]
+        self.SEQ.pack_into(mm, pos, seq + 1)
+        self.FIELDS.pack_into(mm, pos + self.SEQ.size, length, digest, expires_at, offset)
+        self.SEQ.pack_into(mm, pos, seq + 2)
+
+    def set(self, key, body, expires_at=0):
+        mm = self._map()
+        if mm is None or len(body) > self.max_entry:
+            return False
+        digest = self._digest(key)
+        length = len(body)
+        with self._writing():
+            start = self.CURSOR.unpack_from(mm, self.CURSOR_OFFSET)[0]
+            ring_pos = start % self.data_size
+            if ring_pos + length > self.data_size:
+                # bodies never wrap; skip to the start of the ring
+                start += self.data_size - ring_pos
+                ring_pos = 0
+            # reserve before copying so readers stop trusting what we overwrite
+            self.CURSOR.pack_into(mm, self.CURSOR_OFFSET, start + length)
+            mm[self.data_offset + ring_pos:self.data_offset + ring_pos + length] = body
+            now = time.time()
+            rows = [(pos, self.SLOT.unpack_from(mm, pos)) for pos in self._slots(digest)]
+            # same key, else a free/expired/overwritten slot, else the oldest body
+            victim = next((pos for pos, row in rows if row[2] == digest), None)
+            if victim is None:
+                victim = next((pos for pos, (_, _, d, exp, off) in rows
+                               if d == self.EMPTY or (exp and exp <= now) or not self._intact(mm, off)), None)
+            if victim is None:
+                victim = min(rows, key=lambda r: r[1][4])[0]
+            self._publish(mm, victim, length, digest, expires_at, start)
+        self.stats['writes'] += 1
+        return True
+
+    def delete(self, key):
+        mm = self._map()
+        if mm is None:
+            return
+        digest = self._digest(key)
+        with self._writing():
+            for pos in self._slots(digest):
+                if self.SLOT.unpack_from(mm, pos)[2] == digest:
+                    self._publish(mm, pos, 0, self.EMPTY, 0, 0)
+
+    def snapshot(self):
+        return dict(self.stats, path=self.path, enabled=self._mm is not None,
+                    data_bytes=self.data_size, slots=self.slots)
+
+shared_responses = SharedSegment(SHM_CACHE_PATH, SHM_CACHE_BYTES, SHM_CACHE_SLOTS) if SHM_CACHE_BYTES > 0 else None
+
+# Route bodies are stored encoded, with a strong ETag; gzip/brotli variants
+# are made the first time a client asks for them and kept next to the body.
+# Conditional requests are answered with 304 from the stored validators,
+# before any body is read, compressed or serialized.
+RESPONSE_MIN_COMPRESS = 1024
+RESPONSE_ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+# etag, expires_at, last_modified, fresh_until, stale_until; prefixed to bodies in the shared segment
+_FRAME = struct.Struct('<32sdddd')
+
+def _json_body(data):
+    return app.json.dumps_bytes(data) + b'\n'
+
+def _compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=9)
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+def _accepted_encoding():
+    encoding = request.accept_encodings.best_match(RESPONSE_ENCODINGS + ('identity',), default='identity')
+    return None if encoding == 'identity' else encoding
+
+def _tag(response, etag, encoding, last_modified):
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.set_etag(f"{etag}-{encoding}" if encoding else etag)
+    if last_modified:
+        response.last_modified = last_modified
+    return response
+
+def _not_modified(etag, encoding, last_modified):
+    """304 response when the request's validators match, else None."""
+    if request.if_none_match:
+        # any encoding of the same body counts as a match
+        matched = any(request.if_none_match.contains_weak(tag)
+                      for tag in (etag, *(f"{etag}-{e}" for e in RESPONSE_ENCODINGS)))
+    elif request.if_modified_since and last_modified:
+        matched = int(last_modified) <= request.if_modified_since.timestamp()
+    else:
+        return None
+    if not matched:
+        return None
+    return _tag(app.response_class(status=304), etag, encoding, last_modified)
+
+def _body_response(body, etag, encoding, last_modified):
+    response = app.response_class([body], mimetype=app.json.mimetype)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return _tag(response, etag, encoding, last_modified)
+
+def _frame(entry, body):
+    return _FRAME.pack(entry['etag'].encode(), entry['expires_at'], entry['last_modified'],
+                       entry['fresh_until'], entry['stale_until']) + body
+
+def _shared_response(key, encoding):
+    """
+    Response served out of the shared segment, or None. A stored variant is
+    served only while its ETag matches the body's: a writer replacing the
+    body may not have replaced the variants yet.
+    """
+    framed = shared_responses.get(key)
+    if framed is None:
+        return None
+    entry = dict(zip(('etag', 'expires_at', 'last_modified', 'fresh_until', 'stale_until'), _FRAME.unpack_from(framed)))
+    if _past_fresh(entry['fresh_until']):
+        return None
+    entry['etag'] = entry['etag'].decode()
+    body = framed[_FRAME.size:]
+    _note_freshness(entry['fresh_until'], entry['stale_until'])
+    if not encoding or len(body) < RESPONSE_MIN_COMPRESS:
+        encoding = None
+    not_modified = _not_modified(entry['etag'], encoding, entry['last_modified'])
+    if not_modified is not None or not encoding:
+        return not_modified or _body_response(body, entry['etag'], None, entry['last_modified'])
+    variant = shared_responses.get(f"{key}|{encoding}")
+    if variant is not None and _FRAME.unpack_from(variant)[0].decode() == entry['etag']:
+        encoded = variant[_FRAME.size:]
+    else:
+        encoded = _compress(body, encoding)
+        shared_responses.set(f"{key}|{encoding}", _frame(entry, encoded), entry['expires_at'])
+    return _body_response(encoded, entry['etag'], encoding, entry['last_modified'])
+
+def _entry_response(key, entry, encoding):
+    _note_freshness(entry['fresh_until'], entry['stale_until'])
+    if not encoding or len(entry['body']) < RESPONSE_MIN_COMPRESS:
+        encoding = None
+    not_modified = _not_modified(entry['etag'], encoding, entry['last_modified'])
+    if not_modified is not None:
+        return not_modified
+    if not encoding:
+        return _body_response(entry['body'], entry['etag'], None, entry['last_modified'])
+    encoded = entry['variants'].get(encoding)
+    if encoded is None:
+        encoded = _compress(entry['body'], encoding)
+        # cached values must not be mutated: store a copy that carries the new variant
+        remaining = entry['expires_at'] - time.time() if entry['expires_at'] else None
+        if remaining is None or remaining > 0:
+            cache.set(key, dict(entry, variants=dict(entry['variants'], **{encoding: encoded})), timeout=remaining)
+        if shared_responses is not None:
+            shared_responses.set(f"{key}|{encoding}", _frame(entry, encoded), entry['expires_at'])
+    return _body_response(encoded, entry['etag'], encoding, entry['last_modified'])
+
+def _past_fresh(fresh_until):
+    # past the info's soft expiry the route goes back through extract_info,
+    # which serves it as stale (with headers) and revalidates
+    return bool(fresh_until) and fresh_until <= time.time()
+
+def cached_response(key):
+    """
+    Route-level cache lookup: the shared segment first, then this process's
+    cache. Entries past the freshness of the info behind them are misses.
+    """
+    encoding = _accepted_encoding()
+    if shared_responses is not None:
+        response = _shared_response(key, encoding)
+        if response is not None:
+            return response
+    entry = cache.get(key)
+    if not isinstance(entry, dict) or 'fresh_until' not in entry:  # miss, or stored by an older release
+        return None
+    if _past_fresh(entry['fresh_until']):
+        return None
+    if shared_responses is not None:
+        shared_responses.set(key, _frame(entry, entry['body']), entry['expires_at'])
+    return _entry_response(key, entry, encoding)
+
+def store_response(key, data, timeout=None):
+    """
+    Serialize once, keep the JSON bytes in both tiers and answer with them.
+    Stale answers (see _note_stale) are answered but never kept.
+    """
+    body = _json_body(data)
+    encoding = _accepted_encoding()
+    # the requesting client's encoding goes in with the body, so the entry is stored once
+    variants = {encoding: _compress(body, encoding)} if encoding and len(body) >= RESPONSE_MIN_COMPRESS else {}
+    # Last-Modified and edge freshness follow the underlying info, if extract_info ran
+    fresh_until, stale_until = g.get('freshness') or (0, 0)
+    entry = {'body': body, 'etag': hashlib.blake2b(body, digest_size=16).hexdigest(),
+             'expires_at': time.time() + timeout if timeout else 0,
+             'last_modified': g.get('extracted_at') or time.time(),
+             'fresh_until': fresh_until, 'stale_until': stale_until, 'variants': variants}
+    if g.get('stale'):
+        return _entry_response(key, entry, encoding)
+    cache.set(key, entry, timeout=timeout)
+    if shared_responses is not None:
+        shared_responses.set(key, _frame(entry, body), entry['expires_at'])
+        for name, encoded in variants.items():
+            shared_responses.set(f"{key}|{name}", _frame(entry, encoded), entry['expires_at'])
+    return _entry_response(key, entry, encoding)
+
+def drop_response(key):
+    cache.delete(key)
+    if shared_responses is not None:
+        for suffix in ('',) + tuple(f"|{encoding}" for encoding in RESPONSE_ENCODINGS):
+            shared_responses.delete(key + suffix)
+
+def _info_validators():
+    """(etag, last_modified) for a response built from the info extract_info just returned."""
+    extracted_at = g.get('extracted_at') or 0
+    args = sorted((k, v) for k, v in request.args.items(multi=True) if k != 'latest')
+    etag = hashlib.blake2b(f"{request.path}|{args}|{extracted_at!r}".encode(), digest_size=16).hexdigest()
+    return etag, extracted_at
+
+def info_not_modified():
+    """304 when the client already has this route's response for the same extraction."""
+    etag, extracted_at = _info_validators()
+    return _not_modified(etag, None, extracted_at)
+
+def info_response(data):
+    etag, extracted_at = _info_validators()
+    response = jsonify(data)
+    response.set_etag(etag)
+    if extracted_at:
+        response.last_modified = extracted_at
+    return response
+
 # -------------------------
 # Tuneable concurrency + sensible defaults
 # set YT_CONCURRENT_FRAGMENTS in env to control fragment concurrency
 # -------------------------
 DEFAULT_CONCURRENT_FRAGMENTS = int(os.environ.get('YT_CONCURRENT_FRAGMENTS', '3'))
-# Thread pool for running blocking yt_dlp tasks (keeps Flask worker threads free)
+# Worker threads for running blocking yt_dlp tasks (keeps Flask worker threads free)
 YDLP_THREADPOOL_MAX_WORKERS = int(os.environ.get('YDLP_WORKERS', '4'))
-_ytdlp_executor = concurrent.futures.ThreadPoolExecutor(max_workers=YDLP_THREADPOOL_MAX_WORKERS)
+# "thread" runs yt-dlp in the threads above, "process" hands each job to a worker process
+YDLP_BACKEND = os.environ.get('YDLP_BACKEND', 'thread').lower()
+YDLP_WORKER_MAX_JOBS = int(os.environ.get('YDLP_WORKER_MAX_JOBS', '200'))
+YDLP_WORKER_MAX_RSS_MB = int(os.environ.get('YDLP_WORKER_MAX_RSS_MB', '768'))
+
+# -------------------------
+# Priority lanes for yt-dlp jobs
+# - each request class gets its own lane with a queue limit and priority
+# - capacity caps how many workers a lane may occupy at once
+# - reserved workers of a higher-priority lane are never taken by lower
+#   lanes, so slow downloads cannot starve metadata requests
+# - override per lane with LANE_<NAME>_{PRIORITY,CAPACITY,RESERVED,QUEUE}
+# - admission control: a job is refused up front (429 when the lane queue is
+#   full, 503 when it would have to queue and the estimated queue wait +
+#   service time exceeds the caller's timeout) instead of queueing work
+#   nobody will wait for; a job that can start right away is always admitted
+# - the service-time estimate relaxes back to its configured value while the
+#   lane sits idle, so a few slow jobs cannot keep it shut
+# -------------------------
+class AdmissionRejected(Exception):
+    status = 503
+
+    def __init__(self, lane, retry_after, reason):
+        super().__init__(f"lane '{lane}' {reason}")
+        self.lane = lane
+        self.retry_after = retry_after
+
+class LaneFull(AdmissionRejected):
+    status = 429
+
+    def __init__(self, lane, retry_after):
+        super().__init__(lane, retry_after, 'queue is full')
+
+class LaneTooSlow(AdmissionRejected):
+    status = 503
+
+    def __init__(self, lane, retry_after):
+        super().__init__(lane, retry_after, 'cannot finish within the timeout')
+
+class Lane:
+    # weight of the newest sample in the service-time moving average
+    EWMA_ALPHA = 0.2
+    # seconds of idleness that halve the estimate's distance from its configured value
+    IDLE_HALF_LIFE = 30
+
+    def __init__(self, name, priority, capacity, reserved, queue_limit, service_time):
+        env = lambda field, default: int(os.environ.get(f'LANE_{name.upper()}_{field}', str(default)))
+        self.name = name
+        self.priority = env('PRIORITY', priority)
+        self.capacity = env('CAPACITY', capacity)
+        self.reserved = env('RESERVED', reserved)
+        self.queue_limit = env('QUEUE', queue_limit)
+        self.service_time = self.base_service_time = float(service_time)
+        self.idle_since = time.monotonic()
+        self.queue = collections.deque()
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def record_service(self, seconds):
+        self.service_time += self.EWMA_ALPHA * (seconds - self.service_time)
+
+    def _relax(self):
+        if self.running or self.queue:
+            return
+        now = time.monotonic()
+        decay = 0.5 ** ((now - self.idle_since) / self.IDLE_HALF_LIFE)
+        self.service_time = self.base_service_time + (self.service_time - self.base_service_time) * decay
+        self.idle_since = now
+
+    def estimate(self, workers):
+        """(seconds until a new job would start, seconds until it would finish)"""
+        self._relax()
+        slots = max(1, min(self.capacity, workers))
+        queue_wait = len(self.queue) / slots * self.service_time
+        if self.running >= slots:
+            # on average the busiest slot is half-way through its job
+            queue_wait += self.service_time / 2
+        return queue_wait, queue_wait + self.service_time
+
+    def snapshot(self, workers):
+        queue_wait, _ = self.estimate(workers)
+        return {
+            'priority': self.priority,
+            'capacity': self.capacity,
+            'reserved': self.reserved,
+            'queue_limit': self.queue_limit,
+            'running': self.running,
+            'queued': len(self.queue),
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'service_seconds': round(self.service_time, 3),
+            'estimated_wait_seconds': round(queue_wait, 3),
+        }
+
+class LaneScheduler:
+    """
+    Fixed set of worker threads shared by all lanes. A free worker takes the
+    oldest job of the highest-priority lane that is allowed to start.
+    """
+    def __init__(self, workers, lanes):
+        self.workers = workers
+        self.lanes = {lane.name: lane for lane in sorted(lanes, key=lambda l: l.priority)}
+        self._cond = threading.Condition()
+        self._threads = []
+
+    def _start_workers(self):
+        for i in range(self.workers):
+            t = threading.Thread(target=self._work, name=f'ytdlp-worker-{i}', daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, lane_name, fn, *args, deadline=None, timed=True, **kwargs):
+        """
+        Queue fn(*args, **kwargs) on a lane and return its Future.
+        deadline: seconds the caller will wait; raises LaneTooSlow when the
+        lane cannot plausibly finish in time, LaneFull when its queue is full.
+        timed: False keeps the job's runtime out of the lane's service time
+        (streams run for as long as the client keeps reading).
+        """
+        future = concurrent.futures.Future()
+        with self._cond:
+            if not self._threads:
+                self._start_workers()
+            lane = self.lanes[lane_name]
+            queue_wait, finish = lane.estimate(self.workers)
+            if len(lane.queue) >= lane.queue_limit:
+                lane.rejected += 1
+                # a queue place opens each time one of the lane's jobs starts
+                slots = max(1, min(lane.capacity, self.workers))
+                raise LaneFull(lane_name, max(1, math.ceil(lane.service_time / slots)))
+            if deadline is not None and queue_wait > 0 and finish > deadline:
+                lane.rejected += 1
+                # until the backlog ahead of it has shrunk enough to fit the deadline
+                raise LaneTooSlow(lane_name, max(1, math.ceil(finish - deadline)))
+            lane.queue.append((future, fn, args, kwargs, timed))
+            self._cond.notify()
+        return future
+
+    def _can_start(self, lane, busy):
+        if not lane.queue or lane.running >= lane.capacity:
+            return False
+        held = sum(max(0, other.reserved - other.running)
+                   for other in self.lanes.values() if other.priority < lane.priority)
+        return self.workers - busy > held
+
+    def _next_job(self):
+        busy = sum(lane.running for lane in self.lanes.values())
+        for lane in self.lanes.values():
+            if self._can_start(lane, busy):
+                lane.running += 1
+                return lane, lane.queue.popleft()
+        return None, None
+
+    def _work(self):
+        while True:
+            with self._cond:
+                lane, job = self._next_job()
+                while job is None:
+                    self._cond.wait()
+                    lane, job = self._next_job()
+            future, fn, args, kwargs, timed = job
+            started = None
+            try:
+                if future.set_running_or_notify_cancel():
+                    started = time.monotonic() if timed else None
+                    try:
+                        future.set_result(fn(*args, **kwargs))
+                    except BaseException as e:
+                        future.set_exception(e)
+            finally:
+                with self._cond:
+                    lane.running -= 1
+                    lane.completed += 1
+                    if started is not None:
+                        lane.record_service(time.monotonic() - started)
+                    if not lane.running and not lane.queue:
+                        lane.idle_since = time.monotonic()
+                    self._cond.notify_all()
+
+    def snapshot(self):
+        with self._cond:
+            return {name: lane.snapshot(self.workers) for name, lane in self.lanes.items()}
+
+ydl_scheduler = LaneScheduler(YDLP_THREADPOOL_MAX_WORKERS, [
+    # /api/fast-meta, /api/meta
+    Lane('fast_meta', priority=0, capacity=2, reserved=1, queue_limit=32, service_time=2),
+    # /api/all, /api/audio, /api/video, /download and the social routes
+    Lane('full', priority=1, capacity=3, reserved=1, queue_limit=32, service_time=5),
+    # /api/playlist, /api/channel
+    Lane('list', priority=2, capacity=2, reserved=1, queue_limit=8, service_time=15),
+    # ?enrich=1 duration lookups for playlist pages, shared by all requests
+    Lane('enrich', priority=3, capacity=2, reserved=0, queue_limit=32, service_time=3),
+    # refresh-ahead of hot cache entries
+    Lane('refresh', priority=4, capacity=1, reserved=0, queue_limit=16, service_time=5),
+    # ?stream= listings; each holds its worker while the client reads
+    Lane('stream', priority=5, capacity=1, reserved=0, queue_limit=4, service_time=30),
+])
 
 # -------------------------
 # Helper: Convert durations to ISO 8601
@@ -84,15 +1124,18 @@ def to_iso_duration(duration_str: str) -> str:
 # yt-dlp Options and Extraction
 # - add: concurrent_fragment_downloads
 # - add: paths -> temp to ensure temporary fragments go to temp_dir
-# - keep cachedir False for ephemeral hosts
+# - cachedir lives under temp_dir so player JS and solved signatures survive
+#   between requests (set YTDLP_CACHE_DIR= to disable)
 # -------------------------
+YTDLP_CACHE_DIR = os.environ.get('YTDLP_CACHE_DIR', os.path.join(temp_dir, 'yt-dlp-cache'))
+
 common_ydl_opts = {
     'quiet': True,
     'no_warnings': True,
     'skip_download': True,
     'format': 'bestvideo+bestaudio/best',
     'cookiefile': cookies_file,
-    'cachedir': False,
+    'cachedir': YTDLP_CACHE_DIR or False,
     # make yt-dlp write temp/fragment files to our temp dir (avoid repo dir chaos)
     'paths': {'temp': temp_dir},
     # native concurrent fragment downloader setting (works for HLS/DASH)
@@ -105,22 +1148,919 @@ ydl_opts_full = dict(common_ydl_opts)
 # Keep original meta options but add concurrency & temp path
 ydl_opts_meta = dict(common_ydl_opts, simulate=True, noplaylist=True, skip_download=True)
 
+# Metadata-only profile for routes that never return formats (/api/meta,
+# /api/fast-meta, /api/channel):
+# - no DASH/HLS manifests and no player JS, so no signature/n-param deciphering
+# - one player client instead of yt-dlp's multi-client fan-out
+# - format selection is a no-op and "no formats" is not an error
+# ydl_opts_flat additionally lists playlists/channels without extracting
+# every entry
+YT_META_PLAYER_CLIENT = os.environ.get('YT_META_PLAYER_CLIENT', 'web')
+
+def _select_no_formats(ctx):
+    return iter(())
+
+ydl_opts_lean = dict(
+    ydl_opts_meta,
+    format=_select_no_formats,
+    ignore_no_formats_error=True,
+    check_formats=False,
+    extractor_args={'youtube': {
+        'skip': ['dash', 'hls', 'translated_subs'],
+        'player_skip': ['js', 'configs'],
+        'player_client': [YT_META_PLAYER_CLIENT],
+    }},
+)
+ydl_opts_flat = dict(ydl_opts_lean, extract_flat='in_playlist')
+
+# -------------------------
+# Shared player cache
+# - yt-dlp's on-disk cache (signature/n-param solutions, preprocessed player)
+#   gets an in-memory layer shared by every YoutubeDL in the process
+# - raw player JS is kept per "<player id>-<variant>" in memory and on disk,
+#   so only the first request after a player rollout downloads it
+# - disk writes go through a temp file + rename, safe for concurrent workers
+# -------------------------
+PLAYER_CODE_MEMORY_LIMIT = int(os.environ.get('PLAYER_CODE_MEMORY_LIMIT', '8'))
+
+class SharedPlayerCache(yt_dlp.cache.Cache):
+    _memory = collections.OrderedDict()
+    _memory_limit = 1024
+    _lock = threading.Lock()
+
+    def load(self, section, key, dtype='json', default=None, *, min_ver=None):
+        if not self.enabled:
+            return default
+        with self._lock:
+            if (section, key) in self._memory:
+                self._memory.move_to_end((section, key))
+                return self._memory[(section, key)]
+        data = super().load(section, key, dtype, default=None, min_ver=min_ver)
+        if data is None:
+            return default
+        self._remember(section, key, data)
+        return data
+
+    def store(self, section, key, data, dtype='json'):
+        if not self.enabled:
+            return
+        self._remember(section, key, data)
+        super().store(section, key, data, dtype)
+
+    def _remember(self, section, key, data):
+        with self._lock:
+            self._memory[(section, key)] = data
+            self._memory.move_to_end((section, key))
+            while len(self._memory) > self._memory_limit:
+                self._memory.popitem(last=False)
+
+class PlayerCodeCache(dict):
+    """
+    Drop-in for YoutubeIE._code_cache: memory first, then <cachedir>/youtube-player.
+    """
+    def __init__(self, root, limit=PLAYER_CODE_MEMORY_LIMIT):
+        super().__init__()
+        self.root = root
+        self.limit = limit
+
+    def _path(self, key):
+        return os.path.join(self.root, re.sub(r'[^\w.-]', '_', key) + '.js')
+
+    def _remember(self, key, code):
+        dict.__setitem__(self, key, code)
+        while len(self) > self.limit:
+            dict.pop(self, next(iter(self)), None)
+
+    def __contains__(self, key):
+        if dict.__contains__(self, key):
+            return True
+        if not self.root:
+            return False
+        try:
+            with open(self._path(key), encoding='utf-8') as f:
+                code = f.read()
+        except OSError:
+            return False
+        self._remember(key, code)
+        return True
+
+    def __setitem__(self, key, code):
+        self._remember(key, code)
+        if not self.root:
+            return
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(code)
+            os.replace(tmp, self._path(key))
+        except OSError:
+            app.logger.warning('could not persist player %s', key, exc_info=True)
+
+player_code_cache = PlayerCodeCache(os.path.join(YTDLP_CACHE_DIR, 'youtube-player') if YTDLP_CACHE_DIR else None)
+player_data_cache = {}
+
+def _share_player_state(ydl):
+    """Point the YouTube extractor of ``ydl`` at the process-wide player caches."""
+    ydl.cache = SharedPlayerCache(ydl)
+    ie = ydl.get_info_extractor('Youtube')
+    if hasattr(ie, '_code_cache'):
+        ie._code_cache = player_code_cache
+    if hasattr(ie, '_player_cache'):
+        if len(player_data_cache) > 4096:
+            player_data_cache.clear()
+        ie._player_cache = player_data_cache
+
+# -------------------------
+# Cooperative cancellation
+# - every HTTP request yt-dlp makes goes through YoutubeDL.urlopen; once all
+#   callers of a job have given up, the next request raises ExtractionAborted
+# - DownloadCancelled subclasses pass through yt-dlp's extractor error handling
+# -------------------------
+class ExtractionAborted(yt_dlp.utils.DownloadCancelled):
+    msg = 'Extraction abandoned by every caller'
+
+class AbortSignal(threading.Event):
+    """Event that also runs callbacks on set(), e.g. to flag a worker process."""
+    def __init__(self):
+        super().__init__()
+        self._callbacks = []
+
+    def set(self):
+        super().set()
+        for callback in self._callbacks:
+            callback()
+
+    def on_set(self, callback):
+        self._callbacks.append(callback)
+        if self.is_set():
+            callback()
+
+class AbortableYoutubeDL(yt_dlp.YoutubeDL):
+    """
+    YoutubeDL that honours abort_check and loads extractors on demand:
+    with an explicit ie_key only that extractor is instantiated, the full
+    registry is loaded the first time generic URL matching is needed.
+    """
+    # callable returning True once the current job should stop; None when idle
+    abort_check = None
+
+    def __init__(self, params=None, auto_init=True):
+        super().__init__(params, auto_init)
+        self._default_ies_loaded = bool(auto_init)
+
+    def extract_info(self, url, download=True, ie_key=None, *args, **kwargs):
+        if ie_key:
+            if ie_key not in self._ies:
+                self.get_info_extractor(ie_key)
+        elif not self._default_ies_loaded:
+            self.add_default_info_extractors()
+            self._default_ies_loaded = True
+        return super().extract_info(url, download, ie_key, *args, **kwargs)
+
+    def urlopen(self, req):
+        if self.abort_check is not None and self.abort_check():
+            raise ExtractionAborted()
+        return super().urlopen(req)
+
+# -------------------------
+# Pooled YoutubeDL instances, one free-list per options profile
+# - constructing a YoutubeDL parses options, registers extractors, loads the
+#   cookie file and builds the network stack; pay that once, not per request
+# - an instance is only ever used by one job at a time and its per-run state
+#   is reset on check-in; instances are rebuilt after YDL_POOL_MAX_USES jobs
+# -------------------------
+YDL_POOL_SIZE = int(os.environ.get('YDL_POOL_SIZE', str(YDLP_THREADPOOL_MAX_WORKERS)))
+YDL_POOL_MAX_USES = int(os.environ.get('YDL_POOL_MAX_USES', '500'))
+
+class YDLPool:
+    # set on a pooled instance for one job instead of pooling per value
+    JOB_PARAMS = ('playlist_items',)
+
+    def __init__(self, size=YDL_POOL_SIZE, max_uses=YDL_POOL_MAX_USES):
+        self.size = size
+        self.max_uses = max_uses
+        self._free = collections.defaultdict(list)
+        self._uses = {}
+        self._lock = threading.Lock()
+        self.stats = {'created': 0, 'reused': 0, 'retired': 0}
+
+    def _build(self, opts):
+        # YoutubeDL keeps and mutates the params dict it is given
+        ydl = AbortableYoutubeDL(dict(opts), auto_init=False)
+        ydl.__enter__()
+        _share_player_state(ydl)
+        return ydl
+
+    @staticmethod
+    def _reset(ydl):
+        ydl._download_retcode = 0
+        ydl._num_downloads = 0
+        ydl._num_videos = 0
+        ydl._playlist_level = 0
+        ydl._playlist_urls.clear()
+        ydl._printed_messages.clear()
+        ydl.abort_check = None
+        for param in YDLPool.JOB_PARAMS:
+            ydl.params.pop(param, None)
+
+    def _retire(self, ydl):
+        self._uses.pop(id(ydl), None)
+        self.stats['retired'] += 1
+        try:
+            ydl.__exit__(None, None, None)
+        except Exception:
+            pass
+
+    def acquire(self, opts):
+        job_params = {k: opts[k] for k in self.JOB_PARAMS if k in opts}
+        if job_params:
+            opts = {k: v for k, v in opts.items() if k not in job_params}
+        profile = _opts_profile(opts)
+        ydl = None
+        with self._lock:
+            free = self._free[profile]
+            if free:
+                self.stats['reused'] += 1
+                ydl = free.pop()
+        if ydl is None:
+            ydl = self._build(opts)
+            with self._lock:
+                self.stats['created'] += 1
+                self._uses[id(ydl)] = 0
+        ydl.params.update(job_params)
+        return profile, ydl
+
+    def release(self, profile, ydl, healthy=True):
+        with self._lock:
+            uses = self._uses.get(id(ydl), 0) + 1
+            self._uses[id(ydl)] = uses
+            keep = healthy and uses < self.max_uses and len(self._free[profile]) < self.size
+            if keep:
+                self._reset(ydl)
+                self._free[profile].append(ydl)
+        if not keep:
+            self._retire(ydl)
+
+    @contextlib.contextmanager
+    def ydl(self, opts):
+        profile, ydl = self.acquire(opts)
+        healthy = True
+        try:
+            yield ydl
+        except (yt_dlp.utils.DownloadError, ExtractionAborted):
+            # ordinary extraction failures leave the instance reusable
+            raise
+        except BaseException:
+            healthy = False
+            raise
+        finally:
+            self.release(profile, ydl, healthy)
+
+    def close(self):
+        with self._lock:
+            idle = [ydl for free in self._free.values() for ydl in free]
+            self._free.clear()
+        for ydl in idle:
+            self._retire(ydl)
+
+ydl_pool = YDLPool()
+atexit.register(ydl_pool.close)
+
 # -------------------------
 # Helper: run yt_dlp.extract_info in a threadpool with optional timeout
 # -------------------------
-def _run_extract_info(ydl_opts, target, download=False):
+def _run_extract_info(ydl_opts, target, download=False, abort=None, ie_key=None):
     """
     Blocking call to extract_info using the provided ydl options.
     This runs inside a worker thread via executor below.
+    abort: optional AbortSignal that stops the extraction at its next request.
+    ie_key: extractor resolved up front (see resolve_extractor), None for generic matching.
     """
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        return ydl.extract_info(target, download=download)
+    if YDLP_BACKEND == 'process' and not download:
+        return _run_in_process(ydl_opts, target, abort, ie_key)
+    with ydl_pool.ydl(ydl_opts) as ydl:
+        if abort is not None:
+            ydl.abort_check = abort.is_set
+        return ydl.extract_info(target, download=download, ie_key=ie_key)
+
+# -------------------------
+# Process-pool extraction backend (YDLP_BACKEND=process)
+# - extractor regexes, player-response JSON and signature JS are CPU-bound,
+#   so threads alone never get past one core
+# - workers are long-lived and keep their own warm YoutubeDL pool
+# - results come back as zlib-compressed JSON instead of pickled dicts
+# - a worker is replaced after YDLP_WORKER_MAX_JOBS jobs; the pool is
+#   recycled once any worker reports more than YDLP_WORKER_MAX_RSS_MB
+# - abort signals reach workers through a shared flag array, one slot per job
+# -------------------------
+_process_executor = None
+_process_executor_lock = threading.Lock()
+process_stats = {'jobs': 0, 'recycles': 0, 'peak_rss_mb': 0}
+
+_ABORT_SLOTS = 256
+_abort_flags = None
+_free_abort_slots = list(range(_ABORT_SLOTS))
+
+def _init_process_worker(flags):
+    global _abort_flags
+    _abort_flags = flags
+
+def _new_process_executor():
+    global _abort_flags
+    # max_tasks_per_child needs a non-fork start method
+    ctx = multiprocessing.get_context('spawn')
+    if _abort_flags is None:
+        _abort_flags = ctx.RawArray('b', _ABORT_SLOTS)
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=YDLP_THREADPOOL_MAX_WORKERS,
+        mp_context=ctx,
+        initializer=_init_process_worker,
+        initargs=(_abort_flags,),
+        max_tasks_per_child=YDLP_WORKER_MAX_JOBS or None)
+
+def _get_process_executor():
+    global _process_executor
+    with _process_executor_lock:
+        if _process_executor is None:
+            _process_executor = _new_process_executor()
+        return _process_executor
+
+def _recycle_process_executor(old):
+    """Swap in a fresh pool; jobs already running on ``old`` still finish."""
+    global _process_executor
+    with _process_executor_lock:
+        if _process_executor is not old:
+            return
+        _process_executor = _new_process_executor()
+        process_stats['recycles'] += 1
+    old.shutdown(wait=False)
 
-def extract_info(url=None, search_query=None, opts=None, timeout=None):
+def _process_extract(profile, ydl_opts, target, slot=-1, ie_key=None):
     """
-    Run yt-dlp extract_info on a threadpool worker.
+    Runs inside a worker process.
+    Returns (compressed JSON info, peak RSS of the worker in MB).
+    """
+    opts = YDL_PROFILES.get(profile, ydl_opts)
+    try:
+        with ydl_pool.ydl(opts) as ydl:
+            if slot >= 0:
+                ydl.abort_check = lambda: _abort_flags[slot]
+            info = ydl.sanitize_info(ydl.extract_info(target, download=False, ie_key=ie_key))
+    except ExtractionAborted:
+        raise
+    except yt_dlp.utils.DownloadError as e:
+        # exc_info holds a traceback, which cannot be pickled back to the parent
+        raise yt_dlp.utils.DownloadError(str(e)) from None
+    except Exception as e:
+        raise RuntimeError(f"{type(e).__name__}: {e}") from None
+    payload = zlib.compress(json.dumps(info, separators=(',', ':')).encode(), 1)
+    return payload, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024
+
+def _run_in_process(ydl_opts, target, abort=None, ie_key=None):
+    executor = _get_process_executor()
+    slot = -1
+    if abort is not None:
+        with _process_executor_lock:
+            if _free_abort_slots:
+                slot = _free_abort_slots.pop()
+                _abort_flags[slot] = 0
+        if slot >= 0:
+            abort.on_set(lambda: _abort_flags.__setitem__(slot, 1))
+    try:
+        future = executor.submit(_process_extract, _opts_profile(ydl_opts), ydl_opts, target, slot, ie_key)
+        payload, rss_mb = future.result()
+    except concurrent.futures.BrokenExecutor:
+        # a worker died (OOM killer, segfault); start over with a clean pool
+        _recycle_process_executor(executor)
+        raise
+    finally:
+        if slot >= 0:
+            with _process_executor_lock:
+                _free_abort_slots.append(slot)
+    process_stats['jobs'] += 1
+    process_stats['peak_rss_mb'] = max(process_stats['peak_rss_mb'], rss_mb)
+    if rss_mb > YDLP_WORKER_MAX_RSS_MB:
+        app.logger.info('yt-dlp worker at %d MB, recycling process pool', rss_mb)
+        _recycle_process_executor(executor)
+    return json.loads(zlib.decompress(payload))
+
+YDL_PROFILES = {'full': ydl_opts_full, 'meta': ydl_opts_meta, 'lean': ydl_opts_lean, 'flat': ydl_opts_flat}
+
+def _opts_profile(opts):
+    """
+    Name of a registered options profile, "<profile>:<param>=<value>" for one
+    with per-job params (e.g. a playlist range), else a digest that is the
+    same in every process for ad-hoc opts.
+    """
+    for name, profile in YDL_PROFILES.items():
+        if opts is profile:
+            return name
+    job_params = sorted((k, opts[k]) for k in YDLPool.JOB_PARAMS if k in opts)
+    base = {k: v for k, v in opts.items() if k not in YDLPool.JOB_PARAMS} if job_params else opts
+    for name, profile in YDL_PROFILES.items():
+        if base == profile:
+            return name + ''.join(f":{k}={v}" for k, v in job_params)
+    # callables (format selectors, match filters) by name, not by their per-process repr
+    stable = json.dumps(opts, sort_keys=True, default=lambda v: getattr(v, '__qualname__', type(v).__name__))
+    return f"custom:{hashlib.sha1(stable.encode()).hexdigest()[:12]}"
+
+# -------------------------
+# Extractor dispatch by host
+# - without an ie_key yt-dlp tries ~1,800 suitable() regexes for every URL
+# - routes already know their platform; the host (or the route's platform)
+#   narrows that to a handful of candidates, and only those get loaded
+# - unknown hosts fall back to yt-dlp's generic matching
+# -------------------------
+PLATFORM_EXTRACTORS = {
+    'youtube': ('Youtube', 'YoutubeTab', 'YoutubeClip', 'YoutubeYtBe'),
+    'instagram': ('Instagram', 'InstagramStory', 'InstagramUser', 'InstagramIOS'),
+    'twitter': ('Twitter', 'TwitterBroadcast', 'TwitterSpaces', 'TwitterCard', 'TwitterShortener'),
+    'tiktok': ('TikTok', 'TikTokVM', 'TikTokUser', 'TikTokCollection', 'TikTokLive'),
+    'facebook': ('Facebook', 'FacebookReel', 'FacebookPluginsVideo', 'FacebookAds'),
+}
+_HOST_PLATFORMS = {
+    'youtube.com': 'youtube', 'youtu.be': 'youtube', 'youtube-nocookie.com': 'youtube',
+    'instagram.com': 'instagram', 'instagr.am': 'instagram',
+    'twitter.com': 'twitter', 'x.com': 'twitter', 't.co': 'twitter',
+    'tiktok.com': 'tiktok',
+    'facebook.com': 'facebook', 'fb.watch': 'facebook', 'fb.com': 'facebook',
+}
+
+def _host_platform(url):
+    host = urllib.parse.urlsplit(url).hostname or ''
+    while host:
+        if host in _HOST_PLATFORMS:
+            return _HOST_PLATFORMS[host]
+        host = host.partition('.')[2]
+    return None
+
+@functools.lru_cache(maxsize=4096)
+def resolve_extractor(target, platform=None):
+    """
+    (ie_key, id parsed from the URL or None) for a target, or (None, None)
+    when yt-dlp should match it generically.
+    """
+    if target.startswith('ytsearch'):
+        return 'YoutubeSearch', None
+    for ie_key in PLATFORM_EXTRACTORS.get(_host_platform(target) or platform, ()):
+        ie = yt_dlp.extractor.get_info_extractor(ie_key)
+        if ie.suitable(target):
+            return ie_key, ie.get_temp_id(target)
+    return None, None
+
+# -------------------------
+# Canonical targets: every spelling of the same video maps to one key
+# - URLs an extractor can parse an id from -> "<ie_key>:<id>"
+# - searches -> "ytsearch:<normalized query>"
+# - anything else -> normalized URL (host lowercased, tracking params dropped, query sorted)
+# -------------------------
+_TRACKING_PARAMS = {
+    'si', 'feature', 'pp', 'ab_channel', 'fbclid', 'gclid', 'igshid', 'igsh', 'mibextid',
+    'ref', 'ref_src', 's', 'is_from_webapp', 'sender_device', 'share_app_id',
+}
+
+def _canonical_target(target, platform=None):
+    target = (target or '').strip()
+    if target.startswith('ytsearch:'):
+        return 'ytsearch:' + ' '.join(target[len('ytsearch:'):].lower().split())
+    ie_key, video_id = resolve_extractor(target, platform)
+    # watch?v=..&list=.. is the playlist or the video depending on noplaylist
+    if video_id and not (ie_key == 'YoutubeTab' and 'v=' in target):
+        return f"{ie_key}:{video_id}"
+    parts = urllib.parse.urlsplit(target)
+    if not parts.scheme or not parts.netloc:
+        return target
+    host = parts.netloc.lower()
+    for prefix in ('www.', 'm.', 'mobile.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    query = sorted(
+        (k, v) for k, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if k not in _TRACKING_PARAMS and not k.startswith('utm_'))
+    return urllib.parse.urlunsplit(('https', host, parts.path.rstrip('/') or '/', urllib.parse.urlencode(query), ''))
+
+# -------------------------
+# Shared extraction cache (sits under extract_info, used by every route)
+# - entries are keyed by (extractor, video id, options profile)
+# - aliases map searches and non-YouTube URLs onto the entry they resolved to
+# - TTL follows the earliest signed-URL expiry of the formats, minus a margin
+# - hot entries are re-extracted in the background shortly before they expire
+# - past the soft expiry an entry is still served while one refresh runs;
+#   past the hard expiry it is kept only as a fallback if extraction fails
+# -------------------------
+INFO_CACHE_TIMEOUT = int(os.environ.get('INFO_CACHE_TIMEOUT', str(5 * 3600)))
+INFO_MIN_TTL = int(os.environ.get('INFO_MIN_TTL', '60'))
+LIVE_INFO_TTL = int(os.environ.get('LIVE_INFO_TTL', '30'))
+URL_EXPIRY_MARGIN = int(os.environ.get('URL_EXPIRY_MARGIN', '600'))
+INFO_REFRESH_AHEAD = int(os.environ.get('INFO_REFRESH_AHEAD', '900'))
+INFO_HOT_HITS = int(os.environ.get('INFO_HOT_HITS', '3'))
+INFO_STALE_TTL = int(os.environ.get('INFO_STALE_TTL', '3600'))
+INFO_STALE_IF_ERROR = int(os.environ.get('INFO_STALE_IF_ERROR', str(24 * 3600)))
+
+# googlevideo/tiktok use ?expire=<unix> (or /expire/<unix>/), fbcdn/instagram use ?oe=<hex>
+_EXPIRE_RE = re.compile(r'[?&/]expire[=/](\d{9,})')
+_OE_RE = re.compile(r'[?&]oe=([0-9A-Fa-f]{8})\b')
+
+_info_hits = collections.Counter()
+
+def signed_url_expiry(info):
+    """Earliest expiry (unix time) among the info's format URLs, or None."""
+    earliest = None
+    for f in info.get('formats') or [{'url': info.get('url')}]:
+        u = f.get('url') or ''
+        m = _EXPIRE_RE.search(u)
+        ts = int(m.group(1)) if m else None
+        if ts is None:
+            m = _OE_RE.search(u)
+            ts = int(m.group(1), 16) if m else None
+        if ts and (earliest is None or ts < earliest):
+            earliest = ts
+    return earliest
+
+def info_ttl(info):
+    """Seconds a cached extraction stays servable."""
+    if info.get('is_live'):
+        return LIVE_INFO_TTL
+    expiry = signed_url_expiry(info)
+    if expiry is None:
+        return INFO_CACHE_TIMEOUT
+    ttl = int(expiry - time.time()) - URL_EXPIRY_MARGIN
+    return max(INFO_MIN_TTL, min(ttl, INFO_CACHE_TIMEOUT))
+
+def info_lifetimes(info):
+    """
+    (soft, hard, keep) seconds from now: fresh until soft, served while
+    revalidating until hard, retained for stale-if-error until keep.
+    Signed URLs are useless once they expire, so those entries go at hard,
+    the same URL_EXPIRY_MARGIN ahead of the expiry as soft.
+    """
+    soft = info_ttl(info)
+    if info.get('is_live'):
+        return soft, 2 * soft, 2 * soft
+    expiry = signed_url_expiry(info)
+    if expiry is not None:
+        hard = max(int(expiry - time.time()) - URL_EXPIRY_MARGIN, soft)
+        return soft, hard, hard
+    return soft, soft + INFO_STALE_TTL, soft + INFO_STALE_TTL + INFO_STALE_IF_ERROR
+
+def _info_key(extractor, video_id, profile):
+    return f"info:{extractor}:{video_id}:{profile}"
+
+def _alias_key(canonical, profile):
+    return f"info_alias:{canonical}:{profile}"
+
+def _cached_info(canonical, profile):
+    """
+    Return (entry, state) for a cached extraction, or (None, None). state is
+    'fresh', 'refresh' (fresh, but a hot entry in its refresh-ahead window),
+    'stale' (past soft expiry, servable while it revalidates) or 'expired'
+    (past hard expiry, only served if a new extraction fails).
+    """
+    key = f"info:{canonical}:{profile}"
+    entry = cache.get(key)
+    if entry is None:
+        key = cache.get(_alias_key(canonical, profile))
+        entry = cache.get(key) if key else None
+    if entry is None:
+        return None, None
+    _info_hits[key] += 1
+    now = time.time()
+    if now >= entry['stale_until']:
+        return entry, 'expired'
+    if now >= entry['fresh_until']:
+        return entry, 'stale'
+    window = min(INFO_REFRESH_AHEAD, entry['ttl'] / 4)
+    if entry['fresh_until'] - now < window and _info_hits[key] >= INFO_HOT_HITS:
+        return entry, 'refresh'
+    return entry, 'fresh'
+
+def _store_info(canonical, profile, info):
+    extractor, video_id = info.get('extractor_key'), info.get('id')
+    if not (extractor and video_id):
+        return
+    key = _info_key(extractor, video_id, profile)
+    soft, hard, keep = info_lifetimes(info)
+    now = time.time()
+    cache.set(key, {'info': info, 'stored_at': now, 'fresh_until': now + soft, 'stale_until': now + hard,
+                    'ttl': soft}, timeout=keep)
+    if len(_info_hits) > 10000:
+        _info_hits.clear()
+    _info_hits.pop(key, None)
+    if key != f"info:{canonical}:{profile}":
+        cache.set(_alias_key(canonical, profile), key, timeout=max(keep, INFO_CACHE_TIMEOUT))
+
+def _extract_job(ydl_opts, target, canonical, profile, abort=None, ie_key=None):
+    """
+    Worker-side body of one flight: extract, unwrap search results and
+    store the result once for every caller that joined.
+    """
+    try:
+        info = _run_extract_info(ydl_opts, target, abort=abort, ie_key=ie_key)
+    except ExtractionAborted:
+        raise
+    except Exception as e:
+        _store_error(canonical, profile, {'error': str(e)}, 500, classify_error(e))
+        raise
+    # If ytsearch returned a search result dict, the top-level structure can be search results:
+    if target.startswith('ytsearch:') and isinstance(info, dict) and 'entries' in info:
+        info = next(iter(info.get('entries') or []), None)
+    if info:
+        _store_info(canonical, profile, info)
+    elif target.startswith('ytsearch:'):
+        _store_error(canonical, profile, {'error': 'No search results'}, 404, 'semi')
+    return info
+
+# -------------------------
+# Negative cache: failed extractions are remembered per canonical target and
+# options profile (a lean extraction failing says little about a full one)
+# - permanent: removed/deleted/unsupported, won't come back
+# - semi: private, geo-blocked, age/login-gated, no search results
+# - transient: rate limits (checked first: Instagram/Facebook phrase theirs as
+#   "rate-limit reached or login required"), network, bot checks, anything else
+# Timeouts and shed requests are never cached; the job may still succeed.
+# -------------------------
+NEGATIVE_TTLS = {
+    'permanent': int(os.environ.get('NEG_TTL_PERMANENT', '3600')),
+    'semi': int(os.environ.get('NEG_TTL_SEMI', '600')),
+    'transient': int(os.environ.get('NEG_TTL_TRANSIENT', '15')),
+}
+
+_PERMANENT_ERROR_RE = re.compile(
+    r'video unavailable|no longer available|has been removed|been terminated|does not exist|'
+    r'not a valid url|unsupported url|incomplete youtube id|HTTP Error 404|HTTP Error 410|'
+    r'page not found|deleted', re.I)
+_RATE_LIMIT_ERROR_RE = re.compile(r'rate.?limit|too many requests|HTTP Error 429', re.I)
+_SEMI_ERROR_RE = re.compile(
+    r'private|not available in your country|geo.?restrict|blocked it in|confirm your age|'
+    r'age.?restricted|members.?only|join this channel|login required|log in|'
+    r"content isn't available|premieres in|live event will begin", re.I)
+
+negative_stats = collections.Counter()
+
+def classify_error(exc):
+    """'permanent', 'semi' or 'transient' for an exception raised by yt-dlp."""
+    original = (getattr(exc, 'exc_info', None) or (None, None))[1]
+    if isinstance(original, yt_dlp.utils.GeoRestrictedError):
+        return 'semi'
+    if isinstance(original, yt_dlp.utils.UnsupportedError):
+        return 'permanent'
+    message = str(exc)
+    if _RATE_LIMIT_ERROR_RE.search(message):
+        return 'transient'
+    if _SEMI_ERROR_RE.search(message):
+        return 'semi'
+    if _PERMANENT_ERROR_RE.search(message):
+        return 'permanent'
+    return 'transient'
+
+def _store_error(canonical, profile, err, code, kind):
+    ttl = NEGATIVE_TTLS[kind]
+    if ttl > 0:
+        cache.set(f"info_error:{canonical}:{profile}", {'err': err, 'code': code, 'kind': kind,
+                                                        'expires_at': time.time() + ttl}, timeout=ttl)
+        negative_stats[f'stored_{kind}'] += 1
+
+def _negative_entry(canonical, profile):
+    return cache.get(f"info_error:{canonical}:{profile}")
+
+def _cached_error(canonical, profile):
+    """(err, code) of a remembered failure for this target and profile, or None."""
+    entry = _negative_entry(canonical, profile)
+    if entry is None:
+        return None
+    negative_stats[f'hits_{entry["kind"]}'] += 1
+    _note_freshness(entry['expires_at'], entry['expires_at'])
+    return entry['err'], entry['code']
+
+# -------------------------
+# Single-flight: identical concurrent extractions share one yt-dlp job
+# - flights are keyed by canonical target + options profile
+# - a caller timing out never cancels the shared job for the others
+# - a waiting caller never joins a refresh still queued on the refresh lane;
+#   it starts a flight on its own lane and the queued refresh is aborted
+# -------------------------
+_inflight = {}
+_inflight_lock = threading.Lock()
+flight_stats = {'flights': 0, 'callers': 0, 'coalesced': 0, 'max_callers': 0}
+recent_flights = collections.deque(maxlen=50)
+# abandoned = every caller timed out while the job was running;
+# wasted_seconds = worker time spent on abandoned jobs until they stopped
+# superseded = queued refreshes replaced by a caller's own flight
+cancel_stats = {'cancelled_queued': 0, 'abandoned': 0, 'aborted': 0, 'wasted_seconds': 0.0, 'superseded': 0}
+_abandoned = set()
+
+class _Flight:
+    __slots__ = ('key', 'future', 'callers', 'waiting', 'background', 'abort', 'started', 'abandoned_at')
+
+    def __init__(self, key, background=False):
+        self.key = key
+        self.future = None
+        self.callers = 0 if background else 1
+        self.waiting = self.callers
+        self.background = background
+        self.abort = AbortSignal()
+        self.started = time.monotonic()
+        self.abandoned_at = None
+
+def _land_flight(flight):
+    with _inflight_lock:
+        if _inflight.get(flight.key) is flight:
+            del _inflight[flight.key]
+        callers = flight.callers
+        flight_stats['flights'] += 1
+        flight_stats['callers'] += callers
+        flight_stats['coalesced'] += max(callers - 1, 0)
+        flight_stats['max_callers'] = max(flight_stats['max_callers'], callers)
+        recent_flights.append({
+            'target': flight.key[0],
+            'profile': flight.key[1],
+            'callers': callers,
+            'seconds': round(time.monotonic() - flight.started, 3),
+        })
+        if flight.abandoned_at is not None:
+            _abandoned.discard(flight)
+            if not flight.future.cancelled():
+                cancel_stats['wasted_seconds'] += time.monotonic() - flight.abandoned_at
+                if isinstance(flight.future.exception(), ExtractionAborted):
+                    cancel_stats['aborted'] += 1
+    if callers > 1:
+        app.logger.info('yt-dlp flight %s [%s] served %d callers', flight.key[0], flight.key[1], callers)
+
+def _join_flight(ydl_opts, target, canonical, profile, lane='full', background=False, deadline=None,
+                 ie_key=None, job=None):
+    """
+    Return the in-flight extraction for (canonical, profile), submitting a
+    new job on ``lane`` only if none is running. Callers must _leave_flight()
+    when done waiting; background flights (refresh-ahead) are not counted as
+    callers. ``job`` replaces _extract_job (same arguments) for a new flight.
+    Raises AdmissionRejected when the lane refuses the job.
+    """
+    key = (canonical, profile)
+    with _inflight_lock:
+        queued_refresh = None
+        flight = _inflight.get(key)
+        if flight is not None:
+            if background or not flight.background or flight.future.running() or flight.future.done():
+                if not background:
+                    flight.callers += 1
+                    flight.waiting += 1
+                return flight
+            queued_refresh = flight
+        flight = _Flight(key, background)
+        flight.future = ydl_scheduler.submit(lane, job or _extract_job, ydl_opts, target, canonical, profile,
+                                             flight.abort, ie_key, deadline=deadline)
+        _inflight[key] = flight
+        if queued_refresh is not None:
+            cancel_stats['superseded'] += 1
+    # cancel() runs done callbacks (_land_flight) inline, so not under the lock;
+    # if a worker took it meanwhile it stops at its first request
+    if queued_refresh is not None and not queued_refresh.future.cancel():
+        queued_refresh.abort.set()
+    flight.future.add_done_callback(lambda _f: _land_flight(flight))
+    return flight
+
+def _leave_flight(flight):
+    """
+    Drop one waiting caller. When the last caller of an unfinished flight
+    leaves, cancel it if still queued, otherwise abort it cooperatively.
+    """
+    with _inflight_lock:
+        flight.waiting -= 1
+        if flight.waiting > 0 or flight.background or flight.future.done():
+            return
+        # later callers must start a fresh flight rather than join an aborting one
+        if _inflight.get(flight.key) is flight:
+            del _inflight[flight.key]
+    # cancel() runs done callbacks (_land_flight) inline, so not under the lock
+    if flight.future.cancel():
+        with _inflight_lock:
+            cancel_stats['cancelled_queued'] += 1
+        return
+    with _inflight_lock:
+        if flight.future.done():
+            return
+        flight.abandoned_at = time.monotonic()
+        cancel_stats['abandoned'] += 1
+        _abandoned.add(flight)
+    flight.abort.set()
+
+# -------------------------
+# Peer mode: each extraction key has one owner node (consistent hashing)
+# PEERS lists every node's base URL (comma separated), SELF_PEER is this
+# node's entry. Non-owners ask the owner's /_peer/info, where the owner's
+# cache and single-flight apply, and keep the answer in their own cache
+# (unless the owner served it stale). Background refreshes go the same way.
+# If the owner can't be reached the node extracts locally. Requests that
+# arrived from a peer (X-Peer-Hop) are never forwarded again.
+# Peer mode needs PEER_TOKEN; without it (or outside peer mode) /_peer/info
+# does not exist. The owner picks the lane from the profile and caps the
+# wait at PEER_TIMEOUT, whatever the caller asks for.
+# -------------------------
+PEERS = [p.strip().rstrip('/') for p in os.environ.get('PEERS', '').split(',') if p.strip()]
+SELF_PEER = os.environ.get('SELF_PEER', '').strip().rstrip('/')
+PEER_VNODES = int(os.environ.get('PEER_VNODES', '64'))
+PEER_TIMEOUT = float(os.environ.get('PEER_TIMEOUT', '30'))
+PEER_TOKEN = os.environ.get('PEER_TOKEN', '')
+PEER_RETRY_AFTER = float(os.environ.get('PEER_RETRY_AFTER', '10'))
+PEER_PROFILE_LANES = {'full': 'full', 'meta': 'full', 'lean': 'fast_meta', 'flat': 'list'}
+
+peer_stats = collections.Counter()
+_peer_down_until = {}
+
+class HashRing:
+    def __init__(self, nodes, vnodes):
+        points = sorted((self._hash(f"{node}#{i}"), node) for node in nodes for i in range(vnodes))
+        self._hashes = [h for h, _ in points]
+        self._nodes = [node for _, node in points]
+
+    @staticmethod
+    def _hash(value):
+        return int.from_bytes(hashlib.sha1(value.encode()).digest()[:8], 'big')
+
+    def owner(self, key):
+        i = bisect.bisect(self._hashes, self._hash(key)) % len(self._hashes)
+        return self._nodes[i]
+
+peer_ring = HashRing(PEERS, PEER_VNODES) if PEERS and SELF_PEER and PEER_TOKEN else None
+if PEERS and peer_ring is None:
+    app.logger.warning('PEERS is set but SELF_PEER or PEER_TOKEN is missing; peer mode is off')
+_peer_session = requests.Session()
+
+def _peer_owner(canonical, profile):
+    """Base URL of the node to ask for this key, or None to extract here."""
+    if peer_ring is None or profile not in YDL_PROFILES:
+        return None
+    if has_request_context() and request.headers.get('X-Peer-Hop'):
+        return None
+    owner = peer_ring.owner(f"{canonical}:{profile}")
+    if owner == SELF_PEER or _peer_down_until.get(owner, 0) > time.monotonic():
+        return None
+    return owner
+
+def _ask_owner(target, canonical, profile, timeout, refresh, platform):
+    """
+    (info, err, code) from the node owning this key, or None when this node
+    owns it, peer mode is off, or the owner didn't answer.
+    """
+    owner = _peer_owner(canonical, profile)
+    if owner is None:
+        return None
+    params = {'target': target, 'profile': profile, 'platform': platform or ''}
+    if timeout is not None:
+        params['timeout'] = timeout
+    if refresh:
+        params['refresh'] = '1'
+    headers = {'X-Peer-Hop': SELF_PEER, 'X-Peer-Token': PEER_TOKEN}
+    try:
+        resp = _peer_session.get(f"{owner}/_peer/info", params=params, headers=headers,
+                                 timeout=(2, (timeout or PEER_TIMEOUT) + 2))
+        resp.raise_for_status()
+        payload = resp.json()
+    except (requests.RequestException, ValueError):
+        # don't pay the connect timeout again on every request while it's down
+        _peer_down_until[owner] = time.monotonic() + PEER_RETRY_AFTER
+        peer_stats['failed'] += 1
+        return None
+    peer_stats['fetched'] += 1
+    info, err, code = payload.get('info'), payload.get('error'), payload.get('code')
+    if info and payload.get('stale'):
+        # the owner is revalidating it; keep asking rather than caching it here as fresh
+        if has_request_context():
+            g.stale = tuple(payload['stale'])
+    elif info:
+        _store_info(canonical, profile, info)
+    elif err and err.get('retry_after') and has_request_context():
+        g.retry_after = err['retry_after']
+    return info, err, code
+
+def _refresh_job(ydl_opts, target, canonical, profile, abort=None, ie_key=None, platform=None):
+    """
+    Refresh-lane body on a non-owner: the owner's answer (kept by _ask_owner)
+    or, if the owner can't be reached, a local extraction.
+    """
+    answer = _ask_owner(target, canonical, profile, PEER_TIMEOUT, False, platform)
+    if answer is None:
+        return _extract_job(ydl_opts, target, canonical, profile, abort=abort, ie_key=ie_key)
+    info, err, _ = answer
+    if err:
+        raise yt_dlp.utils.DownloadError(err.get('error'))
+    return info
+
+def extract_info(url=None, search_query=None, opts=None, timeout=None, refresh=False, lane='full',
+                 platform=None):
+    """
+    Run yt-dlp extract_info on a scheduler worker thread.
     - opts: yt-dlp options dict
     - timeout: seconds to wait for result; if None, wait indefinitely.
+    - refresh: skip the shared extraction cache (?latest)
+    - lane: scheduler lane ('fast_meta', 'full', 'list'); see ydl_scheduler
+    - platform: route's platform ('youtube', 'instagram', ...) to pick the extractor
+    Results are cached per (extractor, id, profile) and concurrent calls for
+    the same target share one job. Entries past their soft expiry are served
+    while one refresh runs, and any retained entry is served if extraction
+    fails; both set the stale response headers.
     Returns (info, err, code) similar to your original function.
     """
     ydl_opts = opts or ydl_opts_full
@@ -130,25 +2070,152 @@ def extract_info(url=None, search_query=None, opts=None, timeout=None):
         target = f"ytsearch:{search_query}"
     else:
         target = url
+    canonical = _canonical_target(target, platform)
+    profile = _opts_profile(ydl_opts)
+    ie_key, _ = resolve_extractor(target, platform)
+
+    entry, state = _cached_info(canonical, profile)
+    if entry is not None and not refresh and state != 'expired':
+        if state != 'fresh':
+            # non-owners revalidate through the owner too, so the refresh lands in its single-flight
+            job = functools.partial(_refresh_job, platform=platform) if _peer_owner(canonical, profile) else None
+            with contextlib.suppress(AdmissionRejected):
+                _join_flight(ydl_opts, target, canonical, profile, lane='refresh', background=True,
+                             ie_key=ie_key, job=job)
+        if state == 'stale':
+            _note_stale(entry, revalidating=True)
+        _note_extracted(entry['info'], entry['stored_at'])
+        _note_freshness(entry['fresh_until'], entry['stale_until'])
+        return entry['info'], None, None
+
+    # ?latest asks for a new attempt, so it doesn't replay a remembered failure either
+    negative = None if refresh else _cached_error(canonical, profile)
+    if negative is not None:
+        info, (err, code) = None, negative
+    else:
+        info, err, code = (_ask_owner(target, canonical, profile, timeout, refresh, platform)
+                           or _extract_now(ydl_opts, target, canonical, profile, lane, timeout, ie_key))
+        if err:
+            negative = _negative_entry(canonical, profile)
+            if negative is not None:
+                _note_freshness(negative['expires_at'], negative['expires_at'])
+    if err and entry is not None and code != 404:
+        # stale-if-error: an old answer beats a 5xx (or a shed request)
+        _note_stale(entry, revalidating=False)
+        _note_extracted(entry['info'], entry['stored_at'])
+        return entry['info'], None, None
+    if info is not None:
+        soft, hard, _ = info_lifetimes(info)
+        now = time.time()
+        _note_extracted(info, now)
+        _note_freshness(now + soft, now + hard)
+    return info, err, code
+
+def _note_stale(entry, revalidating):
+    if has_request_context():
+        g.stale = (int(time.time() - entry['stored_at']), revalidating)
+
+def _note_freshness(fresh_until, stale_until):
+    # feeds the edge Cache-Control header (see _add_cache_control)
+    if has_request_context():
+        g.freshness = (fresh_until, stale_until)
+
+def _note_extracted(info, fallback):
+    # validators for the response built from this info (see info_response);
+    # yt-dlp stamps processed results with their extraction time as 'epoch'
+    if has_request_context():
+        g.extracted_at = info.get('epoch') or fallback
 
-    future = _ytdlp_executor.submit(_run_extract_info, ydl_opts, target)
+def _extract_now(ydl_opts, target, canonical, profile, lane, timeout, ie_key):
     try:
-        info = future.result(timeout=timeout)
-        # If ytsearch returned a search result dict, the top-level structure can be search results:
-        if search_query and isinstance(info, dict) and 'entries' in info:
-            entries = info.get('entries') or []
-            if not entries:
-                return None, {'error': 'No search results'}, 404
-            return entries[0], None, None
+        flight = _join_flight(ydl_opts, target, canonical, profile, lane=lane, deadline=timeout, ie_key=ie_key)
+    except AdmissionRejected as e:
+        if has_request_context():
+            g.retry_after = e.retry_after
+        return None, {'error': f"yt-dlp is overloaded: {e}", 'retry_after': e.retry_after}, e.status
+    try:
+        info = flight.future.result(timeout=timeout)
+        if target.startswith('ytsearch:') and not info:
+            return None, {'error': 'No search results'}, 404
         return info, None, None
     except concurrent.futures.TimeoutError:
-        # Cancel the running future if it did not finish in time; best-effort
-        future.cancel()
+        # The job keeps running for any other callers; _leave_flight stops it once none remain
         return None, {'error': 'yt-dlp timed out'}, 504
     except yt_dlp.utils.DownloadError as e:
         return None, {'error': str(e)}, 500
     except Exception as e:
         return None, {'error': str(e)}, 500
+    finally:
+        _leave_flight(flight)
+
+@app.after_request
+def _add_retry_after(response):
+    # set by extract_info when admission control sheds a request
+    retry_after = g.pop('retry_after', None)
+    if retry_after is not None and response.status_code in (429, 503):
+        response.headers['Retry-After'] = str(retry_after)
+    return response
+
+@app.after_request
+def _add_stale_headers(response):
+    # set by extract_info when it answers from an entry past its soft expiry
+    stale = g.get('stale')
+    if stale is not None and response.status_code == 200:
+        age, revalidating = stale
+        response.headers['X-Cache'] = 'STALE'
+        response.headers['Age'] = str(age)
+        response.headers['Warning'] = '110 - "Response is Stale"' if revalidating else '111 - "Revalidation Failed"'
+    return response
+
+# -------------------------
+# Edge (CDN) cache headers
+# s-maxage/stale-while-revalidate follow the data behind each response: the
+# info entry's soft and hard expiry (hard is capped at the signed-URL expiry
+# for format lists), a per-route cap for routes carrying drifting fields
+# (view/like/subscriber counts, playlist contents), and the TTL of a
+# remembered failure. ?latest, stale answers, partial answers and anything
+# not listed here are no-store. Browsers always revalidate (max-age=0).
+# -------------------------
+EDGE_STABLE_MAX_AGE = int(os.environ.get('EDGE_STABLE_MAX_AGE', str(24 * 3600)))
+EDGE_VOLATILE_MAX_AGE = int(os.environ.get('EDGE_VOLATILE_MAX_AGE', '600'))
+EDGE_MAX_AGE = {
+    'home': 60,
+    'api_fast_meta': EDGE_STABLE_MAX_AGE,
+    'api_download': EDGE_STABLE_MAX_AGE,
+    'api_audio': EDGE_STABLE_MAX_AGE,
+    'api_video': EDGE_STABLE_MAX_AGE,
+    'api_meta': EDGE_VOLATILE_MAX_AGE,
+    'api_all': EDGE_VOLATILE_MAX_AGE,
+    'api_channel': EDGE_VOLATILE_MAX_AGE,
+    'api_playlist': EDGE_VOLATILE_MAX_AGE,
+    'api_instagram': EDGE_VOLATILE_MAX_AGE,
+    'api_twitter': EDGE_VOLATILE_MAX_AGE,
+    'api_tiktok': EDGE_VOLATILE_MAX_AGE,
+    'api_facebook': EDGE_VOLATILE_MAX_AGE,
+}
+
+def _edge_cache_control(status):
+    cap = EDGE_MAX_AGE.get(request.endpoint)
+    if cap is None or request.method != 'GET' or 'latest' in request.args or g.get('stale'):
+        return 'no-store'
+    fresh_until, stale_until = g.get('freshness') or (0, 0)
+    if not fresh_until:
+        # nothing extracted behind it (static or synthesized answers); errors stay uncached
+        return f"public, max-age=0, s-maxage={cap}" if status in (200, 304) else 'no-store'
+    now = time.time()
+    max_age = int(min(max(fresh_until - now, 0), cap))
+    swr = int(max(stale_until - now - max_age, 0))
+    if max_age <= 0:
+        return 'no-store'
+    if swr:
+        return f"public, max-age=0, s-maxage={max_age}, stale-while-revalidate={swr}"
+    return f"public, max-age=0, s-maxage={max_age}"
+
+@app.after_request
+def _add_cache_control(response):
+    if 'Cache-Control' not in response.headers:
+        response.headers['Cache-Control'] = _edge_cache_control(response.status_code)
+    return response
 
 # -------------------------
 # Format Helpers (unchanged)
@@ -189,32 +2256,440 @@ def build_formats_list(info):
         })
     return fmts
 
+# -------------------------
+# Tiered fast-meta resolver (/api/fast-meta?url=)
+# Each tier only runs while wanted fields are still missing:
+# - synthesized: YouTube link + thumbnail built from the video id, no request
+# - cache: any cached extraction of the same video, whatever its profile
+# - oembed: one small provider call (title, thumbnail); only tried when it
+#   can complete the answer on its own, or to salvage a failed extraction
+# - extract: lean yt-dlp extraction
+# -------------------------
+FAST_META_FIELDS = ('title', 'link', 'duration', 'thumbnail')
+OEMBED_FIELDS = {'title', 'link', 'thumbnail'}
+OEMBED_TIMEOUT = float(os.environ.get('OEMBED_TIMEOUT', '3'))
+OEMBED_ENDPOINTS = {
+    'Youtube': 'https://www.youtube.com/oembed',
+    'TikTok': 'https://www.tiktok.com/oembed',
+}
+
+def _iso_duration_of(seconds):
+    return to_iso_duration(str(int(seconds))) if seconds else None
+
+def _fast_meta_from_info(info):
+    return {
+        'title': info.get('title'),
+        'link': info.get('webpage_url'),
+        'duration': _iso_duration_of(info.get('duration')),
+        'thumbnail': info.get('thumbnail'),
+    }
+
+def _fast_meta_oembed(ie_key, url):
+    endpoint = OEMBED_ENDPOINTS.get(ie_key)
+    if not endpoint:
+        return {}
+    try:
+        resp = requests.get(endpoint, params={'url': url, 'format': 'json'}, timeout=OEMBED_TIMEOUT)
+        if resp.status_code != 200:
+            return {}
+        data = resp.json()
+    except (requests.RequestException, ValueError):
+        return {}
+    return {'title': data.get('title'), 'link': url, 'thumbnail': data.get('thumbnail_url')}
+
+def resolve_fast_meta(url, wanted=FAST_META_FIELDS, timeout=6, refresh=False):
+    """
+    Returns (result, err, code); result carries 'tier' (the last tier that
+    contributed) and 'partial' when an extraction failure left gaps.
+    """
+    result = dict.fromkeys(wanted)
+    tier = None
+
+    def fill(values, name):
+        nonlocal tier
+        used = False
+        for field in wanted:
+            if result[field] is None and values.get(field) is not None:
+                result[field] = values[field]
+                used = True
+        if used:
+            tier = name
+
+    def missing():
+        return {field for field in wanted if result[field] is None}
+
+    ie_key, video_id = resolve_extractor(url, 'youtube')
+    if ie_key == 'Youtube' and video_id:
+        fill({'link': f"https://www.youtube.com/watch?v={video_id}",
+              'thumbnail': f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"}, 'synthesized')
+    if missing() and not refresh:
+        canonical = _canonical_target(url, 'youtube')
+        for profile in ('lean', 'meta', 'full'):
+            entry, _ = _cached_info(canonical, profile)
+            if entry is not None:
+                fill(_fast_meta_from_info(entry['info']), 'cache')
+                break
+    if missing() and missing() <= OEMBED_FIELDS:
+        fill(_fast_meta_oembed(ie_key, url), 'oembed')
+    if missing():
+        info, err, code = extract_info(url, None, opts=ydl_opts_lean, timeout=timeout,
+                                       refresh=refresh, lane='fast_meta', platform='youtube')
+        if err:
+            if 'title' in missing():
+                fill(_fast_meta_oembed(ie_key, url), 'oembed')
+            if result.get('title') is None:
+                return None, err, code
+            result['partial'] = True
+        else:
+            fill(_fast_meta_from_info(info), 'extract')
+    result['tier'] = tier
+    return result, None, None
+
+# -------------------------
+# Field projection (?fields=title,duration,channel.name,formats.url)
+# Dotted paths select inside nested objects and apply to every element of a
+# list. Routes check wants() to skip building (or extracting) what wasn't
+# asked for; route cache keys include the selection.
+# -------------------------
+def requested_fields():
+    """Field tree for ?fields=, or None when the whole response is wanted."""
+    paths = {f.strip() for f in request.args.get('fields', '').split(',') if f.strip()}
+    if not paths:
+        return None
+    tree = {}
+    for path in sorted(paths):
+        node = tree
+        *parents, leaf = path.split('.')
+        for part in parents:
+            child = node.setdefault(part, {})
+            if child is True:  # the whole parent is already selected
+                break
+            node = child
+        else:
+            node[leaf] = True
+    return tree
+
+def wants(fields, name):
+    return fields is None or name in fields
+
+def project(data, fields):
+    if fields is None or fields is True:
+        return data
+    if isinstance(data, list):
+        return [project(item, fields) for item in data]
+    if isinstance(data, dict):
+        return {k: project(data[k], sub) for k, sub in fields.items() if k in data}
+    return data
+
+def fields_key():
+    """Suffix that keeps route cache entries for different selections apart."""
+    fields = request.args.get('fields', '')
+    return '|fields=' + ','.join(sorted({f.strip() for f in fields.split(',') if f.strip()})) if fields else ''
+
+# -------------------------
+# Streamed listings (?stream=ndjson or ?stream=json on /api/playlist, /api/channel)
+# - the listing is extracted unprocessed, so entries come from yt-dlp's lazy
+#   generator page by page instead of after the whole list is resolved
+# - a worker on the stream lane feeds a bounded queue; the response drains
+#   it, so memory holds at most STREAM_QUEUE entries whatever the listing's
+#   size, and streams never take the list lane's workers
+# - the first line goes out as soon as the first page is parsed; failures
+#   before that are ordinary error responses (and negative-cached), later
+#   ones end the stream with an error record
+# - a client that disconnects or stops reading for STREAM_STALL_TIMEOUT
+#   seconds aborts the extraction at its next request; every stream ends
+#   with an error record STREAM_MAX_SECONDS after it was requested
+# - ndjson: {"type": <kind>, ...summary}, one {"type": "video", ...} per
+#   entry, then {"type": "end", "count": n} or {"type": "error", ...}
+# - json: the regular response body, emitted incrementally
+# -------------------------
+STREAM_QUEUE = int(os.environ.get('STREAM_QUEUE', '64'))
+STREAM_START_TIMEOUT = int(os.environ.get('STREAM_START_TIMEOUT', '30'))
+STREAM_ENTRY_TIMEOUT = int(os.environ.get('STREAM_ENTRY_TIMEOUT', '60'))
+STREAM_STALL_TIMEOUT = int(os.environ.get('STREAM_STALL_TIMEOUT', '60'))
+STREAM_MAX_SECONDS = int(os.environ.get('STREAM_MAX_SECONDS', '300'))
+STREAM_MODES = {'ndjson': 'application/x-ndjson', '1': 'application/x-ndjson', 'json': 'application/json'}
+stream_stats = {'started': 0, 'completed': 0, 'failed': 0, 'aborted': 0, 'entries': 0}
+
+def _iter_entries(entries):
+    """Entries of an unprocessed listing, fetched lazily and never kept."""
+    if isinstance(entries, yt_dlp.utils.PagedList):
+        # getslice() would build the whole list; _getslice is its page-by-page generator
+        return entries._getslice(0, None)
+    return iter(entries or ())
+
+def _offer(out, item, abort, ends_at):
+    stalled_at = min(time.monotonic() + STREAM_STALL_TIMEOUT, ends_at)
+    while not abort.is_set():
+        try:
+            out.put(item, timeout=1)
+            return
+        except queue.Full:
+            if time.monotonic() > stalled_at:
+                abort.set()
+    raise ExtractionAborted()
+
+def _stream_job(ydl_opts, target, ie_key, out, abort, ends_at, items=None):
+    """Worker side of a stream: ('info', info), ('entry', e)..., then ('end'|'error', ...)."""
+    offer = functools.partial(_offer, out, abort=abort, ends_at=ends_at)
+    try:
+        with ydl_pool.ydl(ydl_opts) as ydl:
+            ydl.abort_check = abort.is_set
+            info = ydl.extract_info(target, download=False, ie_key=ie_key, process=False)
+            # e.g. a handle that resolves to the channel's tab
+            while info.get('_type') in ('url', 'url_transparent'):
+                info = ydl.extract_info(info['url'], download=False, ie_key=info.get('ie_key'), process=False)
+            entries = info.pop('entries', None)
+            offer(('info', info))
+            entries = _iter_entries(entries)
+            if items is not None:
+                entries = itertools.islice(entries, items[0] - 1, items[1])
+            for entry in entries:
+                if entry is not None:
+                    offer(('entry', entry))
+        offer(('end', None))
+    except ExtractionAborted:
+        stream_stats['aborted'] += 1
+    except Exception as e:
+        with contextlib.suppress(ExtractionAborted):
+            offer(('error', e))
+
+def stream_listing(target, mode, platform, kind, summarize, fields, items=None, refresh=False):
+    """
+    Response streaming a listing's entries as yt-dlp produces them.
+    summarize(info) -> the listing's own fields; entries go under 'videos'.
+    items: optional (start, end), 1-based and inclusive.
+    refresh: don't replay a remembered failure (?latest)
+    Returns a Response, or (body, status) when the stream cannot start.
+    """
+    canonical = _canonical_target(target, platform)
+    profile = _opts_profile(ydl_opts_flat)
+    negative = None if refresh else _cached_error(canonical, profile)
+    if negative is not None:
+        err, code = negative
+        return jsonify(err), code
+    ie_key, _ = resolve_extractor(target, platform)
+    out = queue.Queue(maxsize=STREAM_QUEUE)
+    abort = AbortSignal()
+    ends_at = time.monotonic() + STREAM_MAX_SECONDS
+    try:
+        ydl_scheduler.submit('stream', _stream_job, ydl_opts_flat, target, ie_key, out, abort, ends_at, items,
+                             timed=False)
+    except AdmissionRejected as e:
+        g.retry_after = e.retry_after
+        return jsonify({'error': f"yt-dlp is overloaded: {e}", 'retry_after': e.retry_after}), e.status
+    try:
+        item, payload = out.get(timeout=STREAM_START_TIMEOUT)
+    except queue.Empty:
+        abort.set()
+        return jsonify({'error': 'yt-dlp timed out'}), 504
+    if item == 'error':
+        _store_error(canonical, profile, {'error': str(payload)}, 500, classify_error(payload))
+        return jsonify({'error': str(payload)}), 500
+    stream_stats['started'] += 1
+
+    summary = project(summarize(payload), fields and {k: v for k, v in fields.items() if k != 'videos'})
+    with_entries = wants(fields, 'videos')
+    video_fields = fields and fields.get('videos')
+    if not with_entries:
+        abort.set()
+
+    def records():
+        """Projected entries, then (final kind, count, error or None)."""
+        item, payload, count = 'end', None, 0
+        try:
+            while with_entries:
+                remaining = ends_at - time.monotonic()
+                try:
+                    if remaining <= 0:
+                        raise queue.Empty
+                    item, payload = out.get(timeout=min(STREAM_ENTRY_TIMEOUT, remaining))
+                except queue.Empty:
+                    item, payload = 'error', ('yt-dlp timed out' if time.monotonic() < ends_at
+                                              else f'stream exceeded {STREAM_MAX_SECONDS}s')
+                if item != 'entry':
+                    break
+                count += 1
+                yield project(listing_video(payload), video_fields)
+            stream_stats['entries'] += count
+            stream_stats['completed' if item == 'end' else 'failed'] += 1
+            yield item, count, None if payload is None else str(payload)
+        finally:
+            abort.set()
+
+    dumps = app.json.dumps_bytes
+    def ndjson():
+        yield dumps(dict(summary, type=kind)) + b'\n'
+        for record in records():
+            if isinstance(record, tuple):
+                item, count, error = record
+                yield dumps(dict({'type': item, 'count': count}, **({'error': error} if error else {}))) + b'\n'
+            else:
+                yield dumps(dict(record, type='video')) + b'\n'
+
+    def json_document():
+        head = dumps(summary)[:-1]
+        if not with_entries:
+            yield head + b'}\n'
+            return
+        yield head + (b',' if len(head) > 1 else b'') + b'"videos":['
+        sep = b''
+        for record in records():
+            if isinstance(record, tuple):
+                error = record[2]
+                yield b']' + (b',"error":' + dumps(error) if error else b'') + b'}\n'
+            else:
+                yield sep + dumps(record)
+                sep = b','
+
+    body = json_document() if mode == 'json' else ndjson()
+    response = app.response_class(body, mimetype=STREAM_MODES[mode])
+    response.headers['Cache-Control'] = 'no-store'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+# -------------------------
+# Playlist pages (?page=&page_size= or ?start=&end=, 1-based and inclusive)
+# - listings are always flat; a range becomes yt-dlp's playlist_items, so
+#   only the pages holding those entries are fetched and each range is its
+#   own info and route cache entry
+# - ?enrich=1 fills durations the flat listing lacks with lean extractions
+#   on the enrich lane, whose capacity caps them across all requests; a page
+#   waits on at most PLAYLIST_ENRICH_CONCURRENCY lookups at a time, each
+#   bounded by what is left of PLAYLIST_ENRICH_TIMEOUT, and whatever has not
+#   started by then is cancelled
+# - an incompletely enriched page keeps duration null where it missed and
+#   is not cached (here or at the edge)
+# -------------------------
+PLAYLIST_PAGE_SIZE = int(os.environ.get('PLAYLIST_PAGE_SIZE', '100'))
+PLAYLIST_MAX_PAGE_SIZE = int(os.environ.get('PLAYLIST_MAX_PAGE_SIZE', '500'))
+PLAYLIST_ENRICH_CONCURRENCY = int(os.environ.get('PLAYLIST_ENRICH_CONCURRENCY', '4'))
+PLAYLIST_ENRICH_TIMEOUT = int(os.environ.get('PLAYLIST_ENRICH_TIMEOUT', '20'))
+
+def playlist_range():
+    """(start, end) asked for, None for the whole listing; ValueError when malformed."""
+    args = request.args
+    if 'page' in args or 'page_size' in args:
+        page = int(args.get('page', '1'))
+        size = int(args.get('page_size', str(PLAYLIST_PAGE_SIZE)))
+        start, end = (page - 1) * size + 1, page * size
+    elif 'start' in args or 'end' in args:
+        start = int(args.get('start', '1'))
+        end = int(args.get('end', str(start + PLAYLIST_PAGE_SIZE - 1)))
+    else:
+        return None
+    if start < 1 or end < start or end - start >= PLAYLIST_MAX_PAGE_SIZE:
+        raise ValueError(f"{start}-{end}")
+    return start, end
+
+def enrich_durations(videos):
+    """Fill missing durations in place; True when none is left missing."""
+    missing = [v for v in videos if v.get('duration') is None and v.get('url')]
+    if not missing:
+        return True
+    deadline = time.monotonic() + PLAYLIST_ENRICH_TIMEOUT
+
+    def lookup(url):
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            info, err, _ = extract_info(url, None, opts=ydl_opts_lean, timeout=remaining, lane='enrich',
+                                        platform='youtube')
+            retry_after = (err or {}).get('retry_after')
+            if not retry_after or time.monotonic() + retry_after >= deadline:
+                return info.get('duration') if info else None
+            time.sleep(retry_after)
+
+    pool = concurrent.futures.ThreadPoolExecutor(PLAYLIST_ENRICH_CONCURRENCY, thread_name_prefix='enrich')
+    lookups = {pool.submit(lookup, v['url']): v for v in missing}
+    done, _ = concurrent.futures.wait(lookups, timeout=PLAYLIST_ENRICH_TIMEOUT)
+    # started lookups end by the deadline themselves (their flights are cancelled or aborted)
+    pool.shutdown(wait=False, cancel_futures=True)
+    for future in done:
+        if future.exception() is None and future.result() is not None:
+            lookups[future]['duration'] = future.result()
+    return all(v['duration'] is not None for v in missing)
+
 # -------------------------
 # Flask Routes (mostly unchanged) but using the threaded extract_info
 # - metadata endpoints use a short timeout to return fast (configurable)
 # -------------------------
 @app.route('/')
 def home():
-    key = 'home'
+    key = 'home' + fields_key()
     if 'latest' in request.args:
-        cache.delete(key)
-    data = cache.get(key)
-    if data:
-        return jsonify(data)
+        drop_response(key)
+    cached = cached_response(key)
+    if cached is not None:
+        return cached
     data = {'message': '✅ YouTube API is alive'}
-    cache.set(key, data)
-    return jsonify(data)
+    return store_response(key, project(data, requested_fields()))
+
+# Counters are public; requested targets, peer addresses and file paths are
+# only included for requests carrying X-Stats-Token: $STATS_TOKEN.
+STATS_TOKEN = os.environ.get('STATS_TOKEN', '')
+
+def _without(data, *keys):
+    return {k: v for k, v in data.items() if k not in keys} if data is not None else None
+
+@app.route('/api/stats')
+def api_stats():
+    private = bool(STATS_TOKEN) and hmac.compare_digest(request.headers.get('X-Stats-Token', '').encode(),
+                                                        STATS_TOKEN.encode())
+    with _inflight_lock:
+        recent = [f if private else _without(f, 'target') for f in recent_flights]
+        flights = dict(flight_stats, in_flight=len(_inflight), recent=recent)
+        now = time.monotonic()
+        cancellation = dict(cancel_stats, abandoned_running=len(_abandoned),
+                            abandoned_running_seconds=round(sum(now - f.abandoned_at for f in _abandoned), 3))
+    cache_stats = cache.cache.snapshot()
+    shared_responses_stats = shared_responses.snapshot() if shared_responses is not None else None
+    return jsonify(project({
+        'flights': flights,
+        'lanes': ydl_scheduler.snapshot(),
+        'cancellation': cancellation,
+        'negative_cache': dict(negative_stats),
+        'streams': dict(stream_stats),
+        'peers': (dict(peer_stats, **({'self': SELF_PEER, 'peers': PEERS} if private else {}))
+                  if peer_ring is not None else None),
+        'ydl_pool': dict(ydl_pool.stats),
+        'cache': cache_stats if private else dict(cache_stats, disk=_without(cache_stats['disk'], 'path')),
+        'shared_responses': (shared_responses_stats if private else _without(shared_responses_stats, 'path')),
+        'backend': dict(process_stats, name=YDLP_BACKEND) if YDLP_BACKEND == 'process' else {'name': YDLP_BACKEND},
+    }, requested_fields()))
+
+@app.route('/_peer/info')
+def peer_info():
+    # called by other nodes in peer mode; answers from this node's cache/single-flight
+    if peer_ring is None:
+        return jsonify({'error': 'Not Found'}), 404
+    if not hmac.compare_digest(request.headers.get('X-Peer-Token', '').encode(), PEER_TOKEN.encode()):
+        return jsonify({'error': 'Forbidden'}), 403
+    target = request.args.get('target', '').strip()
+    profile = request.args.get('profile', '')
+    if not target or profile not in PEER_PROFILE_LANES:
+        return jsonify({'error': 'Provide "target" and a known "profile"'}), 400
+    timeout = min(max(request.args.get('timeout', PEER_TIMEOUT, type=float), 1), PEER_TIMEOUT)
+    info, err, code = extract_info(target, None, opts=YDL_PROFILES[profile], timeout=timeout,
+                                   refresh='refresh' in request.args, lane=PEER_PROFILE_LANES[profile],
+                                   platform=request.args.get('platform') or None)
+    peer_stats['served'] += 1
+    return jsonify({'info': info, 'error': err, 'code': code, 'stale': g.get('stale')})
 
 @app.route('/api/fast-meta')
 def api_fast_meta():
     q = request.args.get('search', '').strip()
     u = request.args.get('url', '').strip()
-    key = f"fast_meta:{q}:{u}"
+    fields = requested_fields()
+    # which tier answered (and whether the answer is partial) is always reported
+    shown = fields and dict(fields, tier=True, partial=True)
+    key = f"fast_meta:{q}:{u}" + fields_key()
     if 'latest' in request.args:
-        cache.delete(key)
-    cached = cache.get(key)
+        drop_response(key)
+    cached = cached_response(key)
     if cached is not None:
-        return jsonify(cached)
+        return cached
     if not q and not u:
         return jsonify({'error': 'Provide either "search" or "url" parameter'}), 400
     result = None
@@ -227,24 +2702,29 @@ def api_fast_meta():
                     'title': vid.get('title'),
                     'link': f"https://www.youtube.com/watch?v={vid.get('url_suffix').split('v=')[-1]}",
                     'duration': to_iso_duration(vid.get('duration', '')),
-                    'thumbnail': vid.get('thumbnails', [None])[0]
+                    'thumbnail': vid.get('thumbnails', [None])[0],
+                    'tier': 'search',
                 }
         else:
             # Use a short timeout for metadata so endpoint returns fast (tunable)
             meta_timeout = int(os.environ.get('META_TIMEOUT', '6'))  # seconds
-            info, err, code = extract_info(u, None, opts=ydl_opts_meta, timeout=meta_timeout)
+            wanted = tuple(f for f in FAST_META_FIELDS if wants(fields, f))
+            result, err, code = resolve_fast_meta(u, wanted=wanted, timeout=meta_timeout,
+                                                  refresh='latest' in request.args)
             if err:
                 return jsonify(err), code
-            result = {
-                'title': info.get('title'),
-                'link': info.get('webpage_url'),
-                'duration': to_iso_duration(str(info.get('duration'))),
-                'thumbnail': info.get('thumbnail')
-            }
+            if result.get('partial'):
+                # do not pin an incomplete answer in the cache (here or at the edge)
+                response = jsonify(project(result, shown))
+                response.headers['Cache-Control'] = 'no-store'
+                return response
         if not result:
             return jsonify({'error': 'No results'}), 404
-        cache.set(key, result)
-        return jsonify(result)
+        # answers resolved without an extraction behind them (search, oembed, synthesized) get the edge cap
+        fresh_until, stale_until = g.get('freshness') or (0, 0)
+        timeout = max(int(stale_until - time.time()), 1) if stale_until else EDGE_STABLE_MAX_AGE
+        # encoded once: later hits get the same bytes, naming the tier that resolved them
+        return store_response(key, project(result, shown), timeout=timeout)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -254,19 +2734,29 @@ def api_all():
     u = request.args.get('url', '').strip()
     if not (q or u):
         return jsonify({'error': 'Provide "url" or "search"'}), 400
+    fields = requested_fields()
     # For full info, allow a longer timeout (or None to wait indefinitely)
     full_timeout = int(os.environ.get('FULL_INFO_TIMEOUT', '30'))  # seconds
-    info, err, code = extract_info(u or None, q or None, opts=ydl_opts_full, timeout=full_timeout)
+    if wants(fields, 'formats'):
+        info, err, code = extract_info(u or None, q or None, opts=ydl_opts_full, timeout=full_timeout,
+                                       refresh='latest' in request.args, platform='youtube')
+    else:
+        # no format fields asked for: the metadata-only profile is enough
+        info, err, code = extract_info(u or None, q or None, opts=ydl_opts_lean, timeout=full_timeout,
+                                       refresh='latest' in request.args, lane='fast_meta', platform='youtube')
     if err:
         return jsonify(err), code
-    fmts = build_formats_list(info)
+    not_modified = info_not_modified()
+    if not_modified is not None:
+        return not_modified
+    fmts = build_formats_list(info) if wants(fields, 'formats') else None
     suggestions = [
         {'id': rel.get('id'),
          'title': rel.get('title'),
          'url': rel.get('webpage_url') or rel.get('url'),
          'thumbnail': rel.get('thumbnails', [{}])[0].get('url')}
         for rel in info.get('related', [])
-    ]
+    ] if wants(fields, 'suggestions') else None
     data = {
         'title': info.get('title'),
         'video_url': info.get('webpage_url'),
@@ -288,22 +2778,24 @@ def api_all():
         'formats': fmts,
         'suggestions': suggestions
     }
-    return jsonify(data)
+    return info_response(project(data, fields))
 
 @app.route('/api/meta')
 def api_meta():
     q = request.args.get('search', '').strip()
     u = request.args.get('url', '').strip()
-    key = f"meta:{q}:{u}"
+    fields = requested_fields()
+    key = f"meta:{q}:{u}" + fields_key()
     if 'latest' in request.args:
-        cache.delete(key)
-    cached = cache.get(key)
-    if cached:
-        return jsonify(cached)
+        drop_response(key)
+    cached = cached_response(key)
+    if cached is not None:
+        return cached
     if not (q or u):
         return jsonify({'error': 'Provide "url" or "search"'}), 400
     meta_timeout = int(os.environ.get('META_TIMEOUT', '6'))  # keep metadata quick
-    info, err, code = extract_info(u or None, q or None, opts=ydl_opts_meta, timeout=meta_timeout)
+    info, err, code = extract_info(u or None, q or None, opts=ydl_opts_lean, timeout=meta_timeout,
+                                   refresh='latest' in request.args, lane='fast_meta', platform='youtube')
     if err:
         return jsonify(err), code
     keys = ['id','title','webpage_url','duration','upload_date',
@@ -311,36 +2803,58 @@ def api_meta():
             'tags','is_live','age_limit','average_rating',
             'uploader','uploader_url','uploader_id']
     data = {'metadata': {k: info.get(k) for k in keys}}
-    cache.set(key, data)
-    return jsonify(data)
+    return store_response(key, project(data, fields), timeout=info_lifetimes(info)[2])
+
+def _channel_summary(info):
+    return {
+        'id': info.get('id'),
+        'name': info.get('uploader'),
+        'url': info.get('webpage_url'),
+        'description': info.get('description'),
+        'subscriber_count': info.get('subscriber_count'),
+        'video_count': info.get('channel_follower_count') or info.get('video_count'),
+        'thumbnails': info.get('thumbnails'),
+    }
+
+def _playlist_summary(info):
+    return {
+        'id': info.get('id'),
+        'title': info.get('title'),
+        'url': info.get('webpage_url'),
+        'item_count': info.get('playlist_count'),
+    }
+
+def listing_video(e):
+    return {
+        'id': e.get('id'),
+        'title': e.get('title'),
+        # flat entries only carry the url they would be extracted from
+        'url': e.get('webpage_url') or e.get('url'),
+        'duration': e.get('duration')
+    }
 
 @app.route('/api/channel')
 def api_channel():
     cid = request.args.get('id', '').strip()
     cu = request.args.get('url', '').strip()
-    key = f"channel:{cid or cu}"
+    fields = requested_fields()
+    if request.args.get('stream') in STREAM_MODES and (cid or cu):
+        return stream_listing(cid or cu, request.args['stream'], 'youtube', 'channel', _channel_summary, fields,
+                              refresh='latest' in request.args)
+    key = f"channel:{cid or cu}" + fields_key()
     if 'latest' in request.args:
-        cache.delete(key)
-    cached = cache.get(key)
-    if cached:
-        return jsonify(cached)
+        drop_response(key)
+    cached = cached_response(key)
+    if cached is not None:
+        return cached
     if not (cid or cu):
         return jsonify({'error': 'Provide "url" or "id" parameter for channel'}), 400
     try:
-        info, err, code = extract_info(cid or cu, None, opts=ydl_opts_meta, timeout=20)
+        info, err, code = extract_info(cid or cu, None, opts=ydl_opts_flat, timeout=20,
+                                       refresh='latest' in request.args, lane='list', platform='youtube')
         if err:
             return jsonify(err), code
-        data = {
-            'id': info.get('id'),
-            'name': info.get('uploader'),
-            'url': info.get('webpage_url'),
-            'description': info.get('description'),
-            'subscriber_count': info.get('subscriber_count'),
-            'video_count': info.get('channel_follower_count') or info.get('video_count'),
-            'thumbnails': info.get('thumbnails'),
-        }
-        cache.set(key, data)
-        return jsonify(data)
+        return store_response(key, project(_channel_summary(info), fields), timeout=info_lifetimes(info)[2])
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -348,33 +2862,47 @@ def api_channel():
 def api_playlist():
     pid = request.args.get('id', '').strip()
     pu = request.args.get('url', '').strip()
-    key = f"playlist:{pid or pu}"
+    fields = requested_fields()
+    try:
+        items = playlist_range()
+    except ValueError:
+        return jsonify({'error': f'"page"/"page_size" or "start"/"end" must select 1 to {PLAYLIST_MAX_PAGE_SIZE} '
+                                 'items, counting from 1'}), 400
+    enrich = request.args.get('enrich') == '1'
+    if request.args.get('stream') in STREAM_MODES and (pid or pu):
+        return stream_listing(pid or pu, request.args['stream'], 'youtube', 'playlist', _playlist_summary, fields,
+                              items=items, refresh='latest' in request.args)
+    key = (f"playlist:{pid or pu}" + (f"|items={items[0]}:{items[1]}" if items else '')
+           + ('|enrich' if enrich else '') + fields_key())
     if 'latest' in request.args:
-        cache.delete(key)
-    cached = cache.get(key)
-    if cached:
-        return jsonify(cached)
+        drop_response(key)
+    cached = cached_response(key)
+    if cached is not None:
+        return cached
     if not (pid or pu):
         return jsonify({'error': 'Provide "url" or "id" parameter for playlist'}), 400
     try:
-        info, err, code = extract_info(pid or pu, None, opts=ydl_opts_full, timeout=60)
+        # without videos only the playlist's own fields are needed: don't page through its entries
+        fetch = items if wants(fields, 'videos') else (1, 1)
+        opts = dict(ydl_opts_flat, playlist_items=f"{fetch[0]}:{fetch[1]}") if fetch else ydl_opts_flat
+        info, err, code = extract_info(pid or pu, None, opts=opts, timeout=60,
+                                       refresh='latest' in request.args, lane='list', platform='youtube')
         if err:
             return jsonify(err), code
-        videos = [{
-            'id': e.get('id'),
-            'title': e.get('title'),
-            'url': e.get('webpage_url'),
-            'duration': e.get('duration')
-        } for e in info.get('entries', [])]
-        data = {
-            'id': info.get('id'),
-            'title': info.get('title'),
-            'url': info.get('webpage_url'),
-            'item_count': info.get('playlist_count'),
-            'videos': videos
-        }
-        cache.set(key, data)
-        return jsonify(data)
+        data = _playlist_summary(info)
+        if wants(fields, 'videos'):
+            data['videos'] = [listing_video(e) for e in info.get('entries') or []]
+            complete = not enrich or enrich_durations(data['videos'])
+            if items:
+                count = data['item_count']
+                data.update(start=items[0], end=items[0] + len(data['videos']) - 1,
+                            has_more=items[1] < count if count else len(data['videos']) > items[1] - items[0])
+            if not complete:
+                # do not pin the missing durations in the cache (here or at the edge)
+                response = jsonify(project(data, fields))
+                response.headers['Cache-Control'] = 'no-store'
+                return response
+        return store_response(key, project(data, fields), timeout=info_lifetimes(info)[2])
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -382,100 +2910,113 @@ def api_playlist():
 @app.route('/api/instagram')
 def api_instagram():
     u = request.args.get('url', '').strip()
-    key = f"instagram:{u}"
+    fields = requested_fields()
+    key = f"instagram:{u}" + fields_key()
     if 'latest' in request.args:
-        cache.delete(key)
-    cached = cache.get(key)
-    if cached:
-        return jsonify(cached)
+        drop_response(key)
+    cached = cached_response(key)
+    if cached is not None:
+        return cached
     if not u:
         return jsonify({'error': 'Provide "url" parameter for Instagram'}), 400
     try:
-        info, err, code = extract_info(u, None, opts=ydl_opts_meta, timeout=20)
+        opts = ydl_opts_meta if wants(fields, 'formats') else ydl_opts_lean
+        info, err, code = extract_info(u, None, opts=opts, timeout=20,
+                                       refresh='latest' in request.args,
+                                       platform='instagram')
         if err:
             return jsonify(err), code
-        cache.set(key, info)
-        return jsonify(info)
+        return store_response(key, project(info, fields), timeout=info_lifetimes(info)[2])
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/twitter')
 def api_twitter():
     u = request.args.get('url', '').strip()
-    key = f"twitter:{u}"
+    fields = requested_fields()
+    key = f"twitter:{u}" + fields_key()
     if 'latest' in request.args:
-        cache.delete(key)
-    cached = cache.get(key)
-    if cached:
-        return jsonify(cached)
+        drop_response(key)
+    cached = cached_response(key)
+    if cached is not None:
+        return cached
     if not u:
         return jsonify({'error': 'Provide "url" parameter for Twitter'}), 400
     try:
-        info, err, code = extract_info(u, None, opts=ydl_opts_meta, timeout=20)
+        opts = ydl_opts_meta if wants(fields, 'formats') else ydl_opts_lean
+        info, err, code = extract_info(u, None, opts=opts, timeout=20,
+                                       refresh='latest' in request.args,
+                                       platform='twitter')
         if err:
             return jsonify(err), code
-        cache.set(key, info)
-        return jsonify(info)
+        return store_response(key, project(info, fields), timeout=info_lifetimes(info)[2])
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/tiktok')
 def api_tiktok():
     u = request.args.get('url', '').strip()
-    key = f"tiktok:{u}"
+    fields = requested_fields()
+    key = f"tiktok:{u}" + fields_key()
     if 'latest' in request.args:
-        cache.delete(key)
-    cached = cache.get(key)
-    if cached:
-        return jsonify(cached)
+        drop_response(key)
+    cached = cached_response(key)
+    if cached is not None:
+        return cached
     if not u:
         return jsonify({'error': 'Provide "url" parameter for TikTok'}), 400
     try:
-        info, err, code = extract_info(u, None, opts=ydl_opts_meta, timeout=20)
+        opts = ydl_opts_meta if wants(fields, 'formats') else ydl_opts_lean
+        info, err, code = extract_info(u, None, opts=opts, timeout=20,
+                                       refresh='latest' in request.args,
+                                       platform='tiktok')
         if err:
             return jsonify(err), code
-        cache.set(key, info)
-        return jsonify(info)
+        return store_response(key, project(info, fields), timeout=info_lifetimes(info)[2])
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/facebook')
 def api_facebook():
     u = request.args.get('url', '').strip()
-    key = f"facebook:{u}"
+    fields = requested_fields()
+    key = f"facebook:{u}" + fields_key()
     if 'latest' in request.args:
-        cache.delete(key)
-    cached = cache.get(key)
-    if cached:
-        return jsonify(cached)
+        drop_response(key)
+    cached = cached_response(key)
+    if cached is not None:
+        return cached
     if not u:
         return jsonify({'error': 'Provide "url" parameter for Facebook'}), 400
     try:
-        info, err, code = extract_info(u, None, opts=ydl_opts_meta, timeout=20)
+        opts = ydl_opts_meta if wants(fields, 'formats') else ydl_opts_lean
+        info, err, code = extract_info(u, None, opts=opts, timeout=20,
+                                       refresh='latest' in request.args,
+                                       platform='facebook')
         if err:
             return jsonify(err), code
-        cache.set(key, info)
-        return jsonify(info)
+        return store_response(key, project(info, fields), timeout=info_lifetimes(info)[2])
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 # -------------------------
-# Stream Endpoints (no caching)
+# Stream Endpoints (served from the shared extraction cache)
 # -------------------------
-STREAM_TIMEOUT = 5 * 3600
-
 @app.route('/download')
-@cache.cached(timeout=STREAM_TIMEOUT, key_prefix=lambda: f"download:{request.full_path}")
 def api_download():
     url = request.args.get('url')
     search = request.args.get('search')
     if not (url or search):
         return jsonify({'error': 'Provide "url" or "search"'}), 400
     # downloads require the full extract_info so give a generous timeout or none
-    info, err, code = extract_info(url, search, opts=ydl_opts_full, timeout=None)
+    info, err, code = extract_info(url, search, opts=ydl_opts_full, timeout=None,
+                                   refresh='latest' in request.args, platform='youtube')
     if err:
         return jsonify(err), code
-    return jsonify({'formats': build_formats_list(info)})
+    not_modified = info_not_modified()
+    if not_modified is not None:
+        return not_modified
+    return info_response(project({'formats': build_formats_list(info)}, requested_fields()))
 
 @app.route('/api/audio')
 def api_audio():
@@ -483,11 +3024,15 @@ def api_audio():
     search = request.args.get('search')
     if not (url or search):
         return jsonify({'error': 'Provide "url" or "search"'}), 400
-    info, err, code = extract_info(url, search, opts=ydl_opts_full, timeout=30)
+    info, err, code = extract_info(url, search, opts=ydl_opts_full, timeout=30,
+                                   refresh='latest' in request.args, platform='youtube')
     if err:
         return jsonify(err), code
+    not_modified = info_not_modified()
+    if not_modified is not None:
+        return not_modified
     afmts = [f for f in build_formats_list(info) if f['kind'] in ('audio-only','progressive')]
-    return jsonify({'audio_formats': afmts})
+    return info_response(project({'audio_formats': afmts}, requested_fields()))
 
 @app.route('/api/video')
 def api_video():
@@ -495,8 +3040,16 @@ def api_video():
     search = request.args.get('search')
     if not (url or search):
         return jsonify({'error': 'Provide "url" or "search"'}), 400
-    info, err, code = extract_info(url, search, opts=ydl_opts_full, timeout=30)
+    info, err, code = extract_info(url, search, opts=ydl_opts_full, timeout=30,
+                                   refresh='latest' in request.args, platform='youtube')
     if err:
         return jsonify(err), code
+    not_modified = info_not_modified()
+    if not_modified is not None:
+        return not_modified
     vfmts = [f for f in build_formats_list(info) if f['kind'] in ('video-only','progressive')]
-    return jsonify({'video_formats': vfmts})
+    return info_response(project({'video_formats': vfmts}, requested_fields()))
+
+if __name__ == '__main__':
+    # local runs, e.g. several peers: PORT=5001 SELF_PEER=http://127.0.0.1:5001 PEERS=... python api/index.py
+    app.run(host=os.environ.get('HOST', '127.0.0.1'), port=int(os.environ.get('PORT', '5000')), threaded=True)
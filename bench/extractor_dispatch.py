@@ -0,0 +1,108 @@
+"""
+Extractor dispatch cost: yt-dlp's linear suitable() scan vs. resolve_extractor.
+
+    python bench/extractor_dispatch.py [--rounds 200]
+
+Reports
+- cold start: importing yt_dlp and building a YoutubeDL with the full
+  extractor registry (before) vs. auto_init=False plus the extractors one
+  route needs (after), each measured in a fresh interpreter
+- per-URL dispatch: scanning the registry until an extractor matches
+  (before) vs. the host/platform candidate lookup (after, uncached)
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import textwrap
+import time
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api')
+sys.path.insert(0, API_DIR)
+
+import yt_dlp  # noqa: E402
+import index  # noqa: E402
+
+URLS = [
+    'https://www.youtube.com/watch?v=dQw4w9WgXcQ',
+    'https://youtu.be/dQw4w9WgXcQ',
+    'https://www.youtube.com/playlist?list=PLFgquLnL59alCl_2TQvOiD5Vgm1hCaGSI',
+    'https://www.instagram.com/reel/C1a2b3c4d5e/',
+    'https://x.com/someone/status/1790000000000000000',
+    'https://www.tiktok.com/@someone/video/7300000000000000000',
+    'https://www.facebook.com/watch/?v=1234567890',
+    'https://www.facebook.com/reel/1234567890',
+]
+
+COLD_BEFORE = '''
+import time
+t = time.perf_counter()
+import yt_dlp
+ydl = yt_dlp.YoutubeDL({'quiet': True})
+print(time.perf_counter() - t)
+'''
+
+COLD_AFTER = '''
+import time
+t = time.perf_counter()
+import yt_dlp
+ydl = yt_dlp.YoutubeDL({'quiet': True}, auto_init=False)
+for key in %r:
+    ydl.get_info_extractor(key)
+print(time.perf_counter() - t)
+''' % (index.PLATFORM_EXTRACTORS['youtube'],)
+
+
+def cold(code, runs):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', textwrap.dedent(code)],
+                             capture_output=True, text=True, check=True).stdout
+        samples.append(float(out.strip()) * 1000)
+    return statistics.median(samples)
+
+
+def linear_scan(ydl, url):
+    for ie in ydl._ies.values():
+        if ie.suitable(url):
+            return ie.ie_key()
+
+
+def per_url(fn, rounds):
+    samples = []
+    for _ in range(rounds):
+        for url in URLS:
+            start = time.perf_counter()
+            fn(url)
+            samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.mean(samples), statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=200)
+    parser.add_argument('--cold-runs', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"cold start (median of {args.cold_runs} fresh interpreters)")
+    print(f"  full registry          {cold(COLD_BEFORE, args.cold_runs):9.1f} ms")
+    print(f"  allowlisted extractors {cold(COLD_AFTER, args.cold_runs):9.1f} ms")
+
+    ydl = yt_dlp.YoutubeDL({'quiet': True})
+    print(f"registry size: {len(ydl._ies)} extractors")
+    # warm compiled regexes on both paths before timing
+    for url in URLS:
+        linear_scan(ydl, url)
+        index.resolve_extractor.__wrapped__(url)
+    print(f"per-URL dispatch over {len(URLS)} URLs x {args.rounds} rounds (us)")
+    mean, p50 = per_url(lambda u: linear_scan(ydl, u), args.rounds)
+    print(f"  linear suitable() scan mean {mean:9.1f}   p50 {p50:9.1f}")
+    mean, p50 = per_url(index.resolve_extractor.__wrapped__, args.rounds)
+    print(f"  resolve_extractor      mean {mean:9.1f}   p50 {p50:9.1f}")
+    for url in URLS:
+        print(f"    {index.resolve_extractor(url)[0] or 'generic':<16} {url}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+JSON encoding cost: Flask's stdlib provider vs. the orjson-backed
+FastJSONProvider, over synthetic payloads shaped like real responses.
+
+    python bench/json_encode.py [--iterations 200]
+
+Payloads: a 5,000-entry flat playlist, a YouTube info dict with 80 formats,
+and a 10-item Instagram carousel. Both providers produce compact output with
+sorted keys; reported sizes are the encoded body in bytes.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+import index  # noqa: E402
+
+
+def youtube_format(i):
+    video = i % 3 != 0
+    return {
+        'format_id': str(100 + i), 'format_note': f'{144 * (1 + i % 8)}p', 'ext': 'mp4' if video else 'm4a',
+        'protocol': 'https', 'acodec': 'none' if video else 'mp4a.40.2', 'vcodec': 'avc1.64001F' if video else 'none',
+        'url': f'https://rr3---sn-abc.googlevideo.com/videoplayback?expire=1790000000&itag={100 + i}&' + 'x' * 600,
+        'width': 256 * (1 + i % 8) if video else None, 'height': 144 * (1 + i % 8) if video else None,
+        'fps': 30 if video else None, 'tbr': 128.5 + i, 'filesize': 1_000_000 + i * 12345, 'quality': i % 10,
+        'http_headers': {'User-Agent': 'Mozilla/5.0', 'Accept-Language': 'en-us,en;q=0.5'},
+        'downloader_options': {'http_chunk_size': 10485760}, 'resolution': 'audio only' if not video else '1280x720',
+    }
+
+
+def youtube_info():
+    return {
+        'id': 'dQw4w9WgXcQ', 'title': 'Rick Astley - Never Gonna Give You Up (Official Music Video) ♪',
+        'description': 'The official video for “Never Gonna Give You Up” by Rick Astley. ' * 40,
+        'uploader': 'Rick Astley', 'channel_id': 'UCuAXFkgsw1L7xaCfnd5JJOw', 'duration': 212,
+        'view_count': 1_500_000_000, 'like_count': 17_000_000, 'upload_date': '20091025',
+        'tags': [f'tag{i}' for i in range(30)], 'categories': ['Music'],
+        'thumbnails': [{'url': f'https://i.ytimg.com/vi/dQw4w9WgXcQ/{i}.jpg', 'id': str(i), 'preference': -i}
+                       for i in range(40)],
+        'formats': [youtube_format(i) for i in range(80)],
+        'epoch': 1790000000,
+    }
+
+
+def playlist(n=5000):
+    return {
+        'id': 'PL' + 'a' * 32, 'title': 'Big playlist', 'uploader': 'Someone', '_type': 'playlist',
+        'entries': [{'_type': 'url', 'ie_key': 'Youtube', 'id': f'vid{i:08d}', 'title': f'Video number {i} – live',
+                     'url': f'https://www.youtube.com/watch?v=vid{i:08d}', 'duration': 60 + i % 600,
+                     'channel': 'Someone', 'view_count': i * 37,
+                     'thumbnails': [{'url': f'https://i.ytimg.com/vi/vid{i:08d}/hqdefault.jpg', 'height': 360,
+                                     'width': 480}]}
+                    for i in range(n)],
+    }
+
+
+def carousel(n=10):
+    return {
+        'id': 'C' + 'x' * 10, 'title': 'Post by someone 🌅', 'uploader': 'someone', 'like_count': 4242,
+        'description': 'Sunset ☀️ #travel ' * 20, '_type': 'playlist',
+        'entries': [{'id': f'item{i}', 'ext': 'mp4' if i % 2 else 'jpg', 'width': 1080, 'height': 1350,
+                     'url': f'https://scontent.cdninstagram.com/v/t51/{i}.mp4?' + 'k' * 300,
+                     'formats': [{'format_id': f'{i}-{q}', 'url': f'https://scontent.cdninstagram.com/{i}/{q}?'
+                                  + 'k' * 300, 'width': 270 * q, 'height': 338 * q} for q in range(1, 5)]}
+                    for i in range(n)],
+    }
+
+
+def measure(dumps, payload, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        dumps(payload)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def report(name, samples, size):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{name:<24} mean {statistics.mean(samples):8.3f} ms   "
+          f"p50 {statistics.median(samples):8.3f} ms   p95 {p95:8.3f} ms   {size:>9} B")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    stdlib = DefaultJSONProvider(index.app)
+    encoders = {
+        'stdlib': lambda obj: stdlib.dumps(obj, separators=(',', ':')).encode(),
+        'fast': index.app.json.dumps_bytes,
+    }
+    if not getattr(index.app.json, 'use_orjson', False):
+        print('orjson not available (or JSON_ENCODER=stdlib): "fast" is the stdlib fallback')
+    for label, payload in (('playlist x5000', playlist()), ('youtube 80 formats', youtube_info()),
+                           ('instagram carousel', carousel())):
+        print(f"[{label}] {args.iterations} iterations")
+        for name, dumps in encoders.items():
+            report(name, measure(dumps, payload, args.iterations), len(dumps(payload)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Metadata latency: the old meta profile vs. the lean metadata-only profile,
+replayed from recorded HTTP fixtures so runs are repeatable and offline.
+
+Record once (needs network), then replay as often as needed:
+
+    python bench/meta_profile.py --record fixtures/meta URL [URL ...]
+    python bench/meta_profile.py --fixtures fixtures/meta [--rtt 0.08] URL [URL ...]
+
+Replay serves every request yt-dlp makes from the fixture directory and
+adds --rtt seconds per request to stand in for network round trips, so the
+reported time is CPU time plus (requests x rtt). A request with no fixture
+counts as a miss and fails like a network error.
+"""
+import argparse
+import base64
+import hashlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from yt_dlp.networking import Response  # noqa: E402
+from yt_dlp.networking.exceptions import HTTPError, TransportError  # noqa: E402
+import index  # noqa: E402
+
+PROFILES = {'meta': index.ydl_opts_meta, 'lean': index.ydl_opts_lean}
+
+
+def fixture_key(req):
+    body = req.data if isinstance(req.data, bytes) else b''
+    return hashlib.sha1(f"{req.method} {req.url}".encode() + b'\0' + body).hexdigest()
+
+
+class FixtureYDL(index.AbortableYoutubeDL):
+    fixtures = None
+    record = False
+    rtt = 0.0
+    requests = 0
+    misses = 0
+
+    def urlopen(self, req):
+        if isinstance(req, str):
+            from yt_dlp.networking import Request
+            req = Request(req)
+        FixtureYDL.requests += 1
+        path = os.path.join(self.fixtures, fixture_key(req) + '.json')
+        if self.record:
+            try:
+                res = super().urlopen(req)
+                status, body, error = res.status, res.read(), False
+            except HTTPError as e:
+                res, status, body, error = e.response, e.status, e.response.read(), True
+            with open(path, 'w') as f:
+                json.dump({'url': req.url, 'status': status, 'headers': dict(res.headers),
+                           'body': base64.b64encode(body).decode(), 'error': error}, f)
+        else:
+            time.sleep(self.rtt)
+            if not os.path.exists(path):
+                FixtureYDL.misses += 1
+                raise TransportError(f'no fixture for {req.url}')
+        with open(path) as f:
+            rec = json.load(f)
+        res = Response(io.BytesIO(base64.b64decode(rec['body'])), rec['url'], rec['headers'], rec['status'])
+        if rec['error']:
+            raise HTTPError(res)
+        return res
+
+
+def run(profile, urls, iterations):
+    samples, requests = [], []
+    for _ in range(iterations):
+        for url in urls:
+            ydl = FixtureYDL(dict(PROFILES[profile]), auto_init=False)
+            ie_key, _ = index.resolve_extractor(url)
+            before = FixtureYDL.requests
+            start = time.perf_counter()
+            try:
+                ydl.extract_info(url, download=False, ie_key=ie_key)
+            except Exception as e:
+                print(f"  [{profile}] {url}: {e}")
+            samples.append(time.perf_counter() - start)
+            requests.append(FixtureYDL.requests - before)
+    return samples, requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument('--record', metavar='DIR')
+    mode.add_argument('--fixtures', metavar='DIR')
+    parser.add_argument('--rtt', type=float, default=0.08, help='simulated seconds per request on replay')
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('urls', nargs='+')
+    args = parser.parse_args()
+
+    FixtureYDL.fixtures = args.record or args.fixtures
+    FixtureYDL.record = bool(args.record)
+    FixtureYDL.rtt = args.rtt
+    os.makedirs(FixtureYDL.fixtures, exist_ok=True)
+
+    iterations = 1 if args.record else args.iterations
+    for profile in PROFILES:
+        samples, requests = run(profile, args.urls, iterations)
+        print(f"{profile:<5} mean {statistics.mean(samples) * 1000:9.1f} ms   "
+              f"p50 {statistics.median(samples) * 1000:9.1f} ms   "
+              f"requests/url {statistics.mean(requests):5.1f}")
+    if FixtureYDL.misses:
+        print(f"{FixtureYDL.misses} requests had no fixture; re-record to refresh them")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Per-request YoutubeDL overhead: construct-per-call vs. the pooled instances.
+
+    python bench/ydl_pool.py [--iterations 200] [--url URL]
+
+Without --url only the setup/teardown cost around extract_info is measured,
+so the numbers are independent of the network. With --url each iteration
+also runs a real extraction (needs network access).
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+import yt_dlp  # noqa: E402
+import index  # noqa: E402
+
+
+def construct_per_call(opts, url):
+    with yt_dlp.YoutubeDL(dict(opts)) as ydl:
+        if url:
+            ydl.extract_info(url, download=False)
+
+
+def pooled(opts, url):
+    with index.ydl_pool.ydl(opts) as ydl:
+        if url:
+            ydl.extract_info(url, download=False)
+
+
+def measure(fn, opts, url, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(opts, url)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(name, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{name:<24} mean {statistics.mean(samples):8.3f} ms   "
+          f"p50 {statistics.median(samples):8.3f} ms   p95 {p95:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--url', default=None)
+    args = parser.parse_args()
+
+    for profile, opts in index.YDL_PROFILES.items():
+        # warm imports and the pool before timing
+        construct_per_call(opts, None)
+        pooled(opts, None)
+        print(f"[{profile}] {args.iterations} iterations" + (f" against {args.url}" if args.url else ''))
+        report('construct per call', measure(construct_per_call, opts, args.url, args.iterations))
+        report('pooled', measure(pooled, opts, args.url, args.iterations))
+    print('pool stats:', index.ydl_pool.stats)
+
+
+if __name__ == '__main__':
+    main()